@@ -1,10 +1,42 @@
+import numpy as np
 import pandas as pd
-import scipy.stats as stats
-import statsmodels.api as sm
 
-from typing import Dict, Tuple
-from statsmodels.formula.api import ols
+from functools import reduce
+from typing import Dict, List, Optional, Tuple
 from modules.data_load import load_all_cryptos
+from modules.numba_returns import pct_change_2d
+
+
+def _align_dates(indexes: List[pd.Index]) -> Tuple[pd.Index, List[np.ndarray]]:
+    """
+    Encontra as datas comuns a todos os índices e a posição de cada uma delas em cada índice.
+
+    Para DatetimeIndex ordenados, sem repetições e de mesmo dtype (o caso dos dados diários carregados),
+    a interseção é feita sobre os inteiros int64 (asi8) com np.intersect1d e as posições com
+    searchsorted, sem montar as tabelas hash do pandas. Nos demais casos usa Index.intersection.
+
+    Args:
+        indexes (List[pd.Index]): Índices de datas de cada criptomoeda.
+
+    Returns:
+        Tuple[pd.Index, List[np.ndarray]]: Datas comuns em ordem cronológica e, para cada índice,
+            as posições dessas datas.
+    """
+    first = indexes[0]
+    if all(
+        isinstance(idx, pd.DatetimeIndex) and idx.dtype == first.dtype
+        and idx.is_monotonic_increasing and idx.is_unique
+        for idx in indexes
+    ):
+        common = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), (idx.asi8 for idx in indexes))
+        positions = [idx.asi8.searchsorted(common) for idx in indexes]
+        return first[positions[0]], positions
+
+    dates = reduce(lambda a, b: a.intersection(b), indexes)
+    if not dates.is_monotonic_increasing:
+        dates = dates.sort_values()
+
+    return dates, [idx.get_indexer(dates) for idx in indexes]
 
 
 def calculate_avg_daily_returns(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
@@ -17,12 +49,28 @@ def calculate_avg_daily_returns(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFr
     Returns:
         pd.DataFrame: DataFrame com os retornos diários de todas as criptomoedas.
     """
-    returns_df = pd.DataFrame()
+    if not data_dict:
+        return pd.DataFrame()
+
+    # Fechamentos float64 lado a lado; séries mais curtas são completadas com NaN no final
+    closes = [df['close'].to_numpy(dtype=np.float64, copy=False) for df in data_dict.values()]
+    prices = np.full((max(len(close) for close in closes), len(closes)), np.nan)
+    for j, close in enumerate(closes):
+        prices[:len(close), j] = close
+
+    # Retornos (preço[t] - preço[t-1]) / preço[t-1] de cada moeda no seu próprio índice, como o
+    # pct_change, em um kernel Numba (uma passada por coluna). own_returns[i] é o retorno da linha i + 1.
+    own_returns = pct_change_2d(prices)
 
-    for crypto, df in data_dict.items():
-        returns_df[crypto] = df['close'].pct_change()
+    # Só então os retornos são selecionados nas datas comuns: um dia ausente em uma moeda
+    # não transforma o retorno das outras em um retorno de vários dias
+    dates, positions = _align_dates([df.index for df in data_dict.values()])
+    returns = np.full((len(dates), len(closes)), np.nan)
+    for j, pos in enumerate(positions):
+        has_prev = pos > 0
+        returns[has_prev, j] = own_returns[pos[has_prev] - 1, j]
 
-    return returns_df.dropna()
+    return pd.DataFrame(returns, index=dates, columns=list(data_dict)).dropna()
 
 
 def calculate_avg_trade_count(data_dict: Dict[str, pd.DataFrame]) -> pd.Series:
@@ -35,12 +83,13 @@ def calculate_avg_trade_count(data_dict: Dict[str, pd.DataFrame]) -> pd.Series:
     Returns:
         pd.Series: Série com a média de trades por criptomoeda.
     """
-    trade_counts = pd.DataFrame()
+    if not data_dict:
+        return pd.Series(dtype=float)
 
-    for crypto, df in data_dict.items():
-        trade_counts[crypto] = df.resample('ME')['tradecount'].mean()
+    # Reamostra o volume de trades de todas as criptomoedas em uma única passada
+    trade_counts = pd.concat({crypto: df['tradecount'] for crypto, df in data_dict.items()}, axis=1)
 
-    return trade_counts.tail(12).mean()
+    return trade_counts.resample('ME').mean().tail(12).mean()
 
 
 def check_normalities(df: pd.DataFrame) -> pd.DataFrame:
@@ -53,13 +102,15 @@ def check_normalities(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame com resultados do teste de normalidade por criptomoeda.
     """
-    results = []
+    import scipy.stats as stats
 
-    for crypto in df.columns:
-        _, p_value = stats.shapiro(df[crypto])
-        results.append({'crypto': crypto, 'p_value': p_value, 'is_normal': p_value > 0.05})
+    # Aplica o Shapiro-Wilk em todas as colunas de uma só vez
+    _, p_values = stats.shapiro(df.to_numpy(), axis=0)
 
-    return pd.DataFrame(results).set_index('crypto')
+    return pd.DataFrame(
+        {'p_value': p_values, 'is_normal': p_values > 0.05},
+        index=df.columns.rename('crypto')
+    )
 
 
 def check_homoscedasticity(df: pd.Series | pd.DataFrame) -> Tuple[bool, float]:
@@ -72,23 +123,30 @@ def check_homoscedasticity(df: pd.Series | pd.DataFrame) -> Tuple[bool, float]:
     Returns:
         Tuple[bool, float]: (é_homoscedástico, p_value).
     """
+    import scipy.stats as stats
+
     all_cryptos = [df[crypto] for crypto in df.columns]
     _, p_lev = stats.levene(*all_cryptos, center='median')
 
     return (p_lev > 0.05, p_lev)
 
 
-def evaluate_anova_premises(df: pd.DataFrame) -> pd.Series | pd.DataFrame:
+def evaluate_anova_premises(df: pd.DataFrame, normalities: Optional[pd.DataFrame] = None) -> pd.Series | pd.DataFrame:
     """
     Avalia as premissas necessárias para ANOVA: normalidade e homoscedasticidade.
 
     Args:
         df (pd.DataFrame): DataFrame com os dados para análise.
+        normalities (Optional[pd.DataFrame]): Resultado de check_normalities já calculado para
+            (ao menos) as colunas de df. Se None, o teste é executado aqui.
 
     Returns:
         pd.Series | pd.DataFrame: DataFrame filtrado apenas com criptomoedas que atendem às premissas.
     """
-    normalities = check_normalities(df)
+    if normalities is None:
+        normalities = check_normalities(df)
+    else:
+        normalities = normalities.loc[list(df.columns)]
 
     print('Normalidade de cada criptomoeda:')
     print(normalities)
@@ -112,17 +170,27 @@ def run_anova_analysis(df: pd.Series | pd.DataFrame) -> None:
     Args:
         df (pd.Series | pd.DataFrame): DataFrame com os dados para análise ANOVA.
     """
+    # SciPy e statsmodels são importados apenas quando a ANOVA é de fato executada
+    import scipy.stats as stats
+    import statsmodels.api as sm
+
     long_df = df.melt(var_name='crypto', value_name='quarterly_avg_return')
 
     print('\nMédia geral por criptomoeda:')
     print(long_df.groupby('crypto').mean())
 
-    model = ols('quarterly_avg_return ~ crypto', data=long_df).fit()
-    anova = sm.stats.anova_lm(model, typ=2)
+    # F e p-value da ANOVA de um fator direto pelo SciPy, sem montar a tabela do statsmodels
+    f_stat, p_val = stats.f_oneway(*(df[crypto].dropna().to_numpy() for crypto in df.columns))
 
     print('\nANOVA:')
-    print(anova)
-
+    print(f'F: {f_stat:.4f}, p-value: {p_val:.4f}, Médias iguais? {p_val > 0.05}')
+
+    # O modelo só é ajustado para o diagnóstico de normalidade dos resíduos.
+    # A matriz de projeto é montada direto com dummies, sem o parser de fórmulas (patsy).
+    valid_df = long_df.dropna()
+    y = valid_df['quarterly_avg_return'].to_numpy()
+    X = pd.get_dummies(valid_df['crypto'], drop_first=True).to_numpy(dtype=float)
+    model = sm.OLS(y, sm.add_constant(X, has_constant='add')).fit()
     _, p_val_resid = stats.shapiro(model.resid)
     print(f'\nNormalidade dos resíduos: p-value: {p_val_resid:.4f}, Normal? {p_val_resid > 0.05}')
 
@@ -139,8 +207,11 @@ def run_analysis(period: str, window_size: int) -> None:
     avg_df = calculate_avg_daily_returns(all_cryptos)
     agg_df = avg_df.resample(period).mean().tail(window_size)
 
+    # O Shapiro-Wilk é calculado uma única vez e reaproveitado nos subconjuntos abaixo
+    normalities = check_normalities(agg_df)
+
     print(f'Agrupando os dados por {period} (últimos {window_size} {period}s)\n')
-    df_for_anova = evaluate_anova_premises(agg_df)
+    df_for_anova = evaluate_anova_premises(agg_df, normalities)
     run_anova_analysis(df_for_anova)
 
     print('\nAgrupando a análise por volume de trades')
@@ -150,9 +221,9 @@ def run_analysis(period: str, window_size: int) -> None:
     low_trade_cryptos = avg_trade_count[avg_trade_count < trade_count_median].index.tolist()
 
     print(f'\nANOVA para volume de trades baixo: {low_trade_cryptos}')
-    low_trade_df = evaluate_anova_premises(agg_df[low_trade_cryptos])
+    low_trade_df = evaluate_anova_premises(agg_df[low_trade_cryptos], normalities)
     run_anova_analysis(low_trade_df)
 
     print(f'\nANOVA para volume de trades alto: {high_trade_cryptos}')
-    high_trade_df = evaluate_anova_premises(agg_df[high_trade_cryptos])
+    high_trade_df = evaluate_anova_premises(agg_df[high_trade_cryptos], normalities)
     run_anova_analysis(high_trade_df)
@@ -0,0 +1,24 @@
+"""
+Compilação antecipada (AOT) do kernel de simulate_profit com numba.pycc.
+
+Gera a extensão nativa modules/simulation_native (.so/.pyd), que é importada por
+modules.simulation sem custo de JIT. Sem a extensão, simulation usa o kernel @njit.
+
+Uso (a partir de src/):
+    python -m modules._simulation_aot
+"""
+from pathlib import Path
+from numba.pycc import CC
+
+from modules.simulation import _simulate_profit_kernel
+
+
+cc = CC('simulation_native')
+cc.output_dir = str(Path(__file__).resolve().parent)
+
+# Mesmo código do kernel JIT, exportado com assinatura fixa: (saldo final, variações anormais)
+cc.export('simulate_profit_kernel', 'Tuple((f8, i8))(f8[:], f8[:], f8, f8)')(_simulate_profit_kernel.py_func)
+
+
+if __name__ == '__main__':
+    cc.compile()
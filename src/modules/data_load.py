@@ -1,40 +1,112 @@
 import os
 import pandas as pd
 
-from typing import Dict
+from typing import Dict, Tuple
 from modules.logging import get_logger
 
 
 logger = get_logger('data_loading')
 
+CACHE_DIR = ".cache"
 
-def load_all_cryptos(base_path: str = "data/") -> Dict[str, pd.DataFrame]:
+CRYPTOS = ["ADA", "AVAX", "BNB", "BTC", "DOGE", "DOT", "ETH", "SHIB", "SOL", "XRP"]
+
+# Dados já carregados por base_path, reaproveitados dentro do processo. Só entram aqui cargas
+# completas: se alguma moeda falhar, a próxima chamada tenta ler os arquivos novamente.
+_loaded_cryptos: Dict[str, Dict[str, pd.DataFrame]] = {}
+
+
+def _is_cache_fresh(cache_path: str, file_path: str) -> bool:
     """
-    Carrega os arquivos CSV das criptomoedas e organiza em um dicionário.
+    Verifica se o arquivo Parquet em cache é mais recente que o CSV de origem.
+
+    Args:
+        cache_path (str): Caminho do arquivo .parquet em cache.
+        file_path (str): Caminho do arquivo .csv de origem.
+
+    Returns:
+        bool: True se o cache existe e não está desatualizado.
+    """
+    try:
+        return os.path.getmtime(cache_path) >= os.path.getmtime(file_path)
+    except OSError:
+        return False
+
+
+def _write_cache(df: pd.DataFrame, cache_path: str) -> None:
+    """
+    Salva o DataFrame já normalizado em Parquet para acelerar as próximas leituras.
+
+    Args:
+        df (pd.DataFrame): DataFrame normalizado da criptomoeda.
+        cache_path (str): Caminho do arquivo .parquet a ser gerado.
+    """
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+    except Exception as e:
+        # Falha no cache não impede o carregamento dos dados
+        logger.warning("Não foi possível salvar o cache em %s: %s", cache_path, e)
+
+
+def _read_all_cryptos(base_path: str) -> Tuple[Dict[str, pd.DataFrame], bool]:
+    """
+    Lê os arquivos das criptomoedas (Parquet em cache ou CSV) de base_path.
 
     Args:
         base_path (str): Caminho para a pasta com os arquivos .csv
 
     Returns:
-        Dict[str, pd.DataFrame]: Dicionário contendo os DataFrames por criptomoeda
+        Tuple[Dict[str, pd.DataFrame], bool]: DataFrames por criptomoeda e se todas foram carregadas.
     """
-    cryptos = ["ADA", "AVAX", "BNB", "BTC", "DOGE", "DOT", "ETH", "SHIB", "SOL", "XRP"]
     data = {}
 
-    for coin in cryptos:
+    for coin in CRYPTOS:
         file_path = os.path.join(base_path, f"{coin}.csv")
+        cache_path = os.path.join(base_path, CACHE_DIR, f"{coin}.parquet")
         try:
-            df = pd.read_csv(file_path, skiprows=1)
-            df = df.iloc[::-1].copy()
-            df.columns = [col.lower() for col in df.columns]
-            df['date'] = pd.to_datetime(df['date'])
-            df.sort_values(by='date', inplace=True)  # garante a ordem cronologica dos dados
-            df.set_index('date', inplace=True)
+            if _is_cache_fresh(cache_path, file_path):
+                df = pd.read_parquet(cache_path, engine='pyarrow')
+                logger.info("%s carregada com sucesso do cache %s.", coin, cache_path)
+            else:
+                # Leitura multithread do PyArrow; a primeira linha (origem dos dados) é pulada
+                # manualmente pois o engine pyarrow infere o cabeçalho antes de aplicar skiprows
+                with open(file_path, 'rb') as f:
+                    f.readline()
+                    df = pd.read_csv(f, engine='pyarrow', parse_dates=['Date'])
+                df.columns = [col.lower() for col in df.columns]
+                df.sort_values(by='date', inplace=True)  # garante a ordem cronologica dos dados
+                df.set_index('date', inplace=True)
+
+                _write_cache(df, cache_path)
+                logger.info("%s carregada com sucesso de %s.", coin, file_path)
 
             data[coin] = df
-            logger.info(f"{coin} carregada com sucesso de {file_path}.")
 
         except Exception as e:
-            logger.error(f"Erro ao carregar {coin} de {file_path}: {e}")
+            logger.error("Erro ao carregar %s de %s: %s", coin, file_path, e)
+
+    return data, len(data) == len(CRYPTOS)
+
+
+def load_all_cryptos(base_path: str = "data/") -> Dict[str, pd.DataFrame]:
+    """
+    Carrega os arquivos CSV das criptomoedas e organiza em um dicionário.
+    Na primeira leitura, cada moeda é salva em Parquet em <base_path>/.cache/;
+    as chamadas seguintes leem o Parquet enquanto ele for mais novo que o CSV.
+    Dentro do mesmo processo, os dados já carregados (sem falhas) são reaproveitados.
+
+    Args:
+        base_path (str): Caminho para a pasta com os arquivos .csv
+
+    Returns:
+        Dict[str, pd.DataFrame]: Dicionário contendo os DataFrames por criptomoeda
+    """
+    data = _loaded_cryptos.get(base_path)
+    if data is None:
+        data, complete = _read_all_cryptos(base_path)
+        if complete:
+            _loaded_cryptos[base_path] = data
 
-    return data
+    # Devolve cópias para que alterações do chamador não contaminem o cache
+    return {coin: df.copy() for coin, df in data.items()}
@@ -4,6 +4,87 @@ from scipy import stats
 from typing import Dict, Tuple
 
 
+def _mean_return_t_tests(
+    returns: pd.DataFrame,
+    threshold_percent: float,
+    alpha: float,
+    label: str
+) -> Dict[str, Tuple[float, float, float, bool]]:
+    """
+    Aplica o Shapiro-Wilk e o teste t unilateral à esquerda em todas as moedas de uma vez.
+
+    Args:
+        returns (pd.DataFrame): Retornos (%) de cada moeda em uma coluna; colunas mais curtas completadas com NaN.
+        threshold_percent (float): Valor em percentual para comparação com a média dos retornos.
+        alpha (float): Nível de significância.
+        label (str): Descrição da série usada nas mensagens (ex: 'mensal').
+
+    Returns:
+        Dict[str, Tuple[media_amostral, t_stat, p_value, rejeita_H0]]
+    """
+    results = {}
+
+    n = returns.count().to_numpy()
+    sample_means = returns.mean().to_numpy()
+    sample_stds = returns.std(ddof=1).to_numpy()
+
+    # Testa a normalidade - Shapiro Wilk (apenas colunas com pelo menos 3 observações)
+    enough = n >= 3
+    shapiro_p = np.full(len(n), np.nan)
+    if enough.any():
+        _, shapiro_p[enough] = stats.shapiro(returns.loc[:, enough].to_numpy(), axis=0, nan_policy='omit')
+
+    # Estatística t e p-value para teste bilateral a esquerda (menor que) de todas as moedas
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stats = (sample_means - threshold_percent) / (sample_stds / np.sqrt(n))
+        p_values = stats.t.cdf(t_stats, df=n - 1)
+
+    for i, coin in enumerate(returns.columns):
+        if not enough[i]:
+            print(f"[!] {coin}: dados insuficientes para aplicar o teste (n={n[i]})")
+            results[coin] = (np.nan, np.nan, np.nan, False)
+        elif shapiro_p[i] >= alpha:
+            results[coin] = (sample_means[i], t_stats[i], p_values[i], p_values[i] < alpha)
+        else:
+            # Para os dados que não seguem uma distribuição normal — não aplicar teste t
+            print(f"[!] {coin}: distribuição {label} não é normal (p = {shapiro_p[i]:.4f})")
+            results[coin] = (sample_means[i], np.nan, np.nan, False)
+
+    return results
+
+
+def _numeric_closes(
+    data: Dict[str, pd.DataFrame],
+    failed: Dict[str, Tuple[float, float, float, bool]],
+    require_dates: bool = False
+) -> Dict[str, pd.Series]:
+    """
+    Extrai o fechamento numérico de cada moeda antes de juntar as moedas em um único DataFrame.
+    Uma moeda inválida (sem 'close', com valores não numéricos ou, se exigido, sem índice de datas)
+    é registrada e ignorada, sem interromper o teste das demais.
+
+    Args:
+        data (Dict[str, pd.DataFrame]): Dicionário com DataFrames das criptomoedas.
+        failed (Dict[str, Tuple[float, float, float, bool]]): Recebe o resultado vazio das moedas ignoradas.
+        require_dates (bool): Exige que o índice seja um DatetimeIndex.
+
+    Returns:
+        Dict[str, pd.Series]: Fechamentos em float64 das moedas válidas.
+    """
+    closes = {}
+    for coin, df in data.items():
+        try:
+            close = pd.to_numeric(df['close']).astype(np.float64)
+            if require_dates and not isinstance(close.index, pd.DatetimeIndex):
+                raise TypeError("o índice não é de datas")
+            closes[coin] = close
+        except Exception as e:
+            print(f"Erro na moeda {coin}: {e}")
+            failed[coin] = (np.nan, np.nan, np.nan, False)
+
+    return closes
+
+
 def perform_mean_return_test(
     data: Dict[str, pd.DataFrame],
     threshold_percent: float = 0.05,
@@ -25,41 +106,22 @@ def perform_mean_return_test(
         Dict[str, Tuple[media_amostral, t_stat, p_value, rejeita_H0]]
     """
 
-    results = {}
+    if not data:
+        return {}
 
-    for coin, df in data.items():
-        try:
-            df = df.sort_index()
-            df['returns'] = df['close'].pct_change().dropna()
-
-            returns = df['returns'].dropna() * 100  # aqui eu converto para percentual
-            sample_mean = returns.mean()
-            sample_std = returns.std(ddof=1)
-            n = len(returns)
-
-            # Testa a normalidade - Shapiro Wilk
-            shapiro_stat, shapiro_p = stats.shapiro(returns)
-
-            if shapiro_p >= alpha:
-                # Para os dados que seguem uma distribuição normal — aplicar teste t
-                t_stat = (sample_mean - threshold_percent) / (sample_std / np.sqrt(n))
-                # p-value para teste bilateral a esquerda (menor que)
-                p_value = stats.t.cdf(t_stat, df=n-1)
-                reject_H0 = p_value < alpha
-            else:
-                # Para os dados que não seguem uma distribuição normal — não aplicar teste t
-                print(f"[!] {coin}: distribuição dos retornos não é normal (p = {shapiro_p:.4f})")
-                t_stat = np.nan
-                p_value = np.nan
-                reject_H0 = False
-
-            results[coin] = (sample_mean, t_stat, p_value, reject_H0)
+    failed = {}
+    closes = _numeric_closes(data, failed)
+    if not closes:
+        return failed
 
-        except Exception as e:
-            print(f"Erro na moeda {coin}: {e}")
-            results[coin] = (np.nan, np.nan, np.nan, False)
+    # Retornos diários (%) de cada moeda, alinhados por posição em um único DataFrame
+    returns = pd.concat({
+        coin: (close.sort_index().pct_change().dropna() * 100).reset_index(drop=True)
+        for coin, close in closes.items()
+    }, axis=1)
 
-    return results
+    results = _mean_return_t_tests(returns, threshold_percent, alpha, label='dos retornos')
+    return {coin: failed[coin] if coin in failed else results[coin] for coin in data}
 
 
 def perform_mean_return_monthly_test(
@@ -84,50 +146,28 @@ def perform_mean_return_monthly_test(
     Returns:
         Dict[str, Tuple[media, t_stat, p_value, rejeita_H0]]
     """
-    results = {}
-
-    for coin, df in data.items():
-        try:
-            df = df.sort_index()
-            df['date'] = df.index
-
-            # Agrupa por mês e pega o último fechamento do mês
-            df['month'] = df['date'].dt.to_period('M').apply(lambda r: r.start_time)
-            monthly_close = df.groupby('month')['close'].last()
-
-            # Calcula o retorno percentual mensal
-            monthly_returns = monthly_close.pct_change().dropna() * 100
+    if not data:
+        return {}
 
-            # Considera apenas os últimos 6 meses
-            monthly_returns = monthly_returns[-6:]
+    failed = {}
+    valid_closes = _numeric_closes(data, failed, require_dates=True)
+    if not valid_closes:
+        return failed
 
-            # Verifica se há dados suficientes
-            if len(monthly_returns) < 3:
-                print(f"[!] {coin}: dados insuficientes para aplicar o teste (n={len(monthly_returns)})")
-                results[coin] = (np.nan, np.nan, np.nan, False)
-                continue
+    # Reúne os fechamentos de todas as moedas em um único DataFrame
+    closes = pd.concat(valid_closes, axis=1).sort_index()
 
-            _, shapiro_p = stats.shapiro(monthly_returns)
+    # Agrupa por mês e pega o último fechamento do mês
+    monthly_close = closes.resample('MS').last()
 
-            if shapiro_p >= alpha:
-                sample_mean = monthly_returns.mean()
-                sample_std = monthly_returns.std(ddof=1)
-                n = len(monthly_returns)
+    # Calcula o retorno percentual mensal de todas as moedas de uma vez
+    all_monthly_returns = monthly_close.pct_change() * 100
 
-                t_stat = (sample_mean - threshold_percent) / (sample_std / np.sqrt(n))
-                p_value = stats.t.cdf(t_stat, df=n - 1)
-                reject_H0 = p_value < alpha
-            else:
-                print(f"[!] {coin}: distribuição mensal não é normal (p = {shapiro_p:.4f})")
-                sample_mean = monthly_returns.mean()
-                t_stat = np.nan
-                p_value = np.nan
-                reject_H0 = False
+    # Considera apenas os últimos 6 meses de cada moeda
+    recent_returns = pd.concat({
+        coin: all_monthly_returns[coin].dropna()[-6:].reset_index(drop=True)
+        for coin in all_monthly_returns.columns
+    }, axis=1)
 
-            results[coin] = (sample_mean, t_stat, p_value, reject_H0)
-
-        except Exception as e:
-            print(f"Erro na moeda {coin}: {e}")
-            results[coin] = (np.nan, np.nan, np.nan, False)
-
-    return results
+    results = _mean_return_t_tests(recent_returns, threshold_percent, alpha, label='mensal')
+    return {coin: failed[coin] if coin in failed else results[coin] for coin in data}
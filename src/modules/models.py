@@ -1,13 +1,16 @@
+import threading
 import numpy as np
 import pandas as pd
 
+from pathlib import Path
 from typing import Tuple, Optional, Dict
+from joblib import Memory, Parallel, delayed
 from sklearn.model_selection import train_test_split
 from sklearn.model_selection import KFold
 from sklearn.neural_network import MLPRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
+from sklearn.preprocessing import FunctionTransformer, PolynomialFeatures
 from sklearn.pipeline import make_pipeline
 
 from modules.logging import get_logger
@@ -15,6 +18,13 @@ from modules.logging import get_logger
 
 logger = get_logger('models')
 
+# Modelos treinados ficam em cache/models/ e são reaproveitados quando as entradas se repetem
+models_cache_dir = Path(__file__).resolve().parents[2] / 'cache' / 'models'
+memory = Memory(models_cache_dir, verbose=0)
+
+# Hiperparâmetros do MLPRegressor; são passados como argumento ao treino com cache, então entram na chave
+MLP_PARAMS = {'hidden_layer_sizes': (100, 50), 'activation': 'relu', 'solver': 'adam', 'max_iter': 500, 'random_state': 42}
+
 
 def prepare_features(df: pd.DataFrame, window: int = 7) -> Tuple[np.ndarray, np.ndarray]:
     """
@@ -25,21 +35,41 @@ def prepare_features(df: pd.DataFrame, window: int = 7) -> Tuple[np.ndarray, np.
         window (int): Número de dias anteriores para usar como feature.
 
     Returns:
-        Tuple[np.ndarray, np.ndarray]: Features (X) e target (y).
+        Tuple[np.ndarray, np.ndarray]: Features (X) e target (y) em float32.
     """
     try:
-        df = df.copy()
-        for i in range(1, window + 1):
-            df[f'lag_{i}'] = df['close'].shift(i)
-        df.dropna(inplace=True)
-        X = df[[f'lag_{i}' for i in range(1, window + 1)]].values
-        y = df['close'].values
+        close = df['close'].to_numpy(dtype=np.float32)
+
+        if len(close) <= window:
+            return np.empty((0, window), dtype=np.float32), np.empty(0, dtype=np.float32)
+
+        # Cada linha contém [t-window, ..., t-1, t] sem copiar os dados (stride trick)
+        windows = np.lib.stride_tricks.sliding_window_view(close, window + 1)
+        if np.isnan(close).any():
+            windows = windows[~np.isnan(windows).any(axis=1)]
+
+        # float32 reduz pela metade o tráfego de memória no treinamento do MLP
+        X = np.ascontiguousarray(windows[:, -2::-1])  # lag_1, lag_2, ..., lag_window
+        y = np.ascontiguousarray(windows[:, -1])
         return X, y
     except Exception as e:
         logger.exception("Erro ao preparar features: %s", e)
         raise
 
 
+def _to_float64(X: np.ndarray) -> np.ndarray:
+    """
+    Converte as features para float64 (sem cópia se já estiverem nesse tipo).
+
+    Args:
+        X (np.ndarray): Features.
+
+    Returns:
+        np.ndarray: Features em float64.
+    """
+    return np.asarray(X, dtype=np.float64)
+
+
 def split_data(X: np.ndarray, y: np.ndarray, test_size: float = 0.2) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
     Divide os dados em treino e teste.
@@ -55,44 +85,136 @@ def split_data(X: np.ndarray, y: np.ndarray, test_size: float = 0.2) -> Tuple[np
     return train_test_split(X, y, test_size=test_size, random_state=42)
 
 
-def train_mlp_model(X: np.ndarray, y: np.ndarray, k: int = 5) -> Optional[MLPRegressor]:
+# Buffers de cópia dos folds, um conjunto por thread de cada processo de treino, reaproveitados entre folds
+_fold_buffers = threading.local()
+
+
+def _gather_rows(name: str, a: np.ndarray, idx: np.ndarray) -> np.ndarray:
     """
-    Treina o modelo MLPRegressor usando validação cruzada K-Fold.
+    Copia as linhas a[idx] para um buffer reaproveitado entre os folds treinados no mesmo processo/thread.
+    O buffer só é realocado quando não comporta as linhas (ou o formato/tipo muda).
+
+    Args:
+        name (str): Identificador do buffer (ex.: 'X_train').
+        a (np.ndarray): Array de origem.
+        idx (np.ndarray): Índices das linhas a copiar.
+
+    Returns:
+        np.ndarray: View do buffer com as linhas copiadas.
+    """
+    buffers = getattr(_fold_buffers, 'buffers', None)
+    if buffers is None:
+        buffers = _fold_buffers.buffers = {}
+
+    buf = buffers.get(name)
+    if buf is None or buf.shape[0] < len(idx) or buf.shape[1:] != a.shape[1:] or buf.dtype != a.dtype:
+        buf = buffers[name] = np.empty((len(idx),) + a.shape[1:], dtype=a.dtype)
+
+    out = buf[:len(idx)]
+    np.take(a, idx, axis=0, out=out)
+    return out
+
+
+def _fit_fold(X: np.ndarray, y: np.ndarray, train_idx: np.ndarray, val_idx: np.ndarray,
+              params: dict) -> Tuple[float, float, MLPRegressor]:
+    """
+    Treina e valida o MLPRegressor em um único fold do K-Fold. As linhas do fold são copiadas
+    aqui, no processo que treina, para buffers reaproveitados entre os folds desse processo.
+
+    Args:
+        X (np.ndarray): Features completas.
+        y (np.ndarray): Target completo.
+        train_idx (np.ndarray): Índices das linhas de treino do fold.
+        val_idx (np.ndarray): Índices das linhas de validação do fold.
+        params (dict): Hiperparâmetros do MLPRegressor.
+
+    Returns:
+        Tuple[float, float, MLPRegressor]: MSE e R² na validação e o modelo treinado.
+    """
+    X_train, y_train = _gather_rows('X_train', X, train_idx), _gather_rows('y_train', y, train_idx)
+    X_val, y_val = _gather_rows('X_val', X, val_idx), _gather_rows('y_val', y, val_idx)
+
+    model = MLPRegressor(**params)
+    model.fit(X_train, y_train)
+
+    y_pred = model.predict(X_val)
+    mse = mean_squared_error(y_val, y_pred)
+    r2 = r2_score(y_val, y_pred)
+    return mse, r2, model
+
+
+def _train_mlp_kfold(X: np.ndarray, y: np.ndarray, k: int, params: dict) -> MLPRegressor:
+    """
+    Treina o MLPRegressor com validação cruzada K-Fold e retorna o modelo do melhor fold.
+    Erros são propagados, para que uma falha nunca seja gravada no cache em disco.
 
     Args:
         X (np.ndarray): Features.
         y (np.ndarray): Target.
         k (int): Número de folds para K-Fold cross-validation.
+        params (dict): Hiperparâmetros do MLPRegressor.
 
     Returns:
-        Optional[MLPRegressor]: Modelo treinado com melhor desempenho.
+        MLPRegressor: Modelo treinado com melhor desempenho.
     """
-    try:
-        best_model = None
-        best_score = float('inf')
-        kf = KFold(n_splits=k, shuffle=True, random_state=42)
+    best_model = None
+    best_score = float('inf')
+    kf = KFold(n_splits=k, shuffle=True, random_state=42)
 
-        for fold, (train_idx, val_idx) in enumerate(kf.split(X)):
-            X_train, X_val = X[train_idx], X[val_idx]
-            y_train, y_val = y[train_idx], y[val_idx]
+    # Os folds são independentes, então são treinados em paralelo
+    results = Parallel(n_jobs=-1, prefer='processes')(
+        delayed(_fit_fold)(X, y, train_idx, val_idx, params) for train_idx, val_idx in kf.split(X)
+    )
 
-            model = MLPRegressor(hidden_layer_sizes=(100, 50), activation='relu',
-                                 solver='adam', max_iter=500, random_state=42)
-            model.fit(X_train, y_train)
+    for fold, (mse, r2, model) in enumerate(results):
+        logger.info("Fold %d: MSE = %.4f, R² = %.4f", fold + 1, mse, r2)
 
-            y_pred = model.predict(X_val)
-            mse = mean_squared_error(y_val, y_pred)
-            r2 = r2_score(y_val, y_pred)
+        if mse < best_score:
+            best_score = mse
+            best_model = model
 
-            logger.info(f"Fold {fold+1}: MSE = {mse:.4f}, R² = {r2:.4f}")
+    logger.info("Treinamento concluído. Melhor MSE: %.4f", best_score)
+    return best_model
 
-            if mse < best_score:
-                best_score = mse
-                best_model = model
 
-        logger.info("Treinamento concluído. Melhor MSE: %.4f", best_score)
-        return best_model
+# Versão de _train_mlp_kfold com cache em disco, chaveada pelo hash de (X, y, k, params)
+_train_mlp_kfold_cached = memory.cache(_train_mlp_kfold)
 
+
+def train_mlp_model(X: np.ndarray, y: np.ndarray, k: int = 5) -> Optional[MLPRegressor]:
+    """
+    Treina o modelo MLPRegressor usando validação cruzada K-Fold.
+
+    Args:
+        X (np.ndarray): Features.
+        y (np.ndarray): Target.
+        k (int): Número de folds para K-Fold cross-validation.
+
+    Returns:
+        Optional[MLPRegressor]: Modelo treinado com melhor desempenho (None em caso de erro).
+    """
+    try:
+        return _train_mlp_kfold(X, y, k, MLP_PARAMS)
+    except Exception as e:
+        logger.exception("Erro ao treinar modelo: %s", e)
+        return None
+
+
+def train_mlp_model_cached(X: np.ndarray, y: np.ndarray, k: int = 5) -> Optional[MLPRegressor]:
+    """
+    Igual a train_mlp_model, mas reaproveita o modelo salvo em disco quando (X, y, k) e os
+    hiperparâmetros se repetem. Falhas não são gravadas no cache.
+
+    Args:
+        X (np.ndarray): Features.
+        y (np.ndarray): Target.
+        k (int): Número de folds para K-Fold cross-validation.
+
+    Returns:
+        Optional[MLPRegressor]: Modelo treinado com melhor desempenho (None em caso de erro).
+    """
+    try:
+        return _train_mlp_kfold_cached(X, y, k, MLP_PARAMS)
     except Exception as e:
         logger.exception("Erro ao treinar modelo: %s", e)
         return None
@@ -114,7 +236,7 @@ def evaluate_model(model: MLPRegressor, X_test: np.ndarray, y_test: np.ndarray)
         y_pred = model.predict(X_test)
         mse = mean_squared_error(y_test, y_pred)
         r2 = r2_score(y_test, y_pred)
-        logger.info(f"Avaliação do modelo: MSE={mse:.4f}, R²={r2:.4f}")
+        logger.info("Avaliação do modelo: MSE=%.4f, R²=%.4f", mse, r2)
         return {"mse": mse, "r2": r2}
     except Exception as e:
         logger.exception("Erro ao avaliar modelo: %s", e)
@@ -132,11 +254,32 @@ def train_linear_model(X: np.ndarray, y: np.ndarray) -> object:
     Returns:
         object: Modelo treinado.
     """
-    model = LinearRegression()
+    # Mínimos quadrados em float32 perde precisão com lags muito correlacionados.
+    # A conversão faz parte do pipeline, então vale também para as features float32 do predict.
+    model = make_pipeline(FunctionTransformer(_to_float64), LinearRegression())
     model.fit(X, y)
     return model
 
 
+def _fit_polynomial_model(degree: int, X: np.ndarray, y: np.ndarray) -> Tuple[int, object]:
+    """
+    Ajusta um único modelo de regressão polinomial.
+
+    Args:
+        degree (int): Grau do polinômio.
+        X (np.ndarray): Features.
+        y (np.ndarray): Target.
+
+    Returns:
+        Tuple[int, object]: Grau e modelo treinado.
+    """
+    # Em float32, potências altas dos preços (ex: 1e5 ** 10) estouram o limite do tipo; a conversão
+    # para float64 faz parte do pipeline, então vale tanto no fit quanto no predict
+    model = make_pipeline(FunctionTransformer(_to_float64), PolynomialFeatures(degree), LinearRegression())
+    model.fit(X, y)
+    return degree, model
+
+
 def train_polynomial_models(X: np.ndarray, y: np.ndarray, degrees: list = list(range(2, 11))) -> dict:
     """
     Treina modelos de regressão polinomial de grau 2 a 10.
@@ -149,9 +292,8 @@ def train_polynomial_models(X: np.ndarray, y: np.ndarray, degrees: list = list(r
     Returns:
         dict: Dicionário com os modelos treinados por grau.
     """
-    models = {}
-    for d in degrees:
-        model = make_pipeline(PolynomialFeatures(d), LinearRegression())
-        model.fit(X, y)
-        models[d] = model
-    return models
+    # Cada grau é independente, então os ajustes rodam em paralelo
+    results = Parallel(n_jobs=-1, backend='loky')(
+        delayed(_fit_polynomial_model)(d, X, y) for d in degrees
+    )
+    return dict(results)
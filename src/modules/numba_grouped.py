@@ -0,0 +1,64 @@
+import numpy as np
+
+from numba import njit, prange, types
+from typing import Tuple
+from modules.numba_utils import F8_1D, I8_1D
+
+
+@njit(
+    types.Tuple((types.int64[:],) + (types.float64[:],) * 5)(F8_1D, I8_1D, I8_1D),
+    parallel=True,
+    cache=True
+)
+def grouped_stats(values: np.ndarray, order: np.ndarray, starts: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Estatísticas por grupo em uma única passada (Welford) por grupo, grupos processados em paralelo.
+    Valores NaN são ignorados, como no groupby do pandas.
+
+    Args:
+        values (np.ndarray): Valores de todas as linhas.
+        order (np.ndarray): Índices das linhas ordenados por grupo (ex.: argsort estável dos códigos).
+        starts (np.ndarray): Posição inicial de cada grupo em order, com n_grupos + 1 elementos.
+
+    Returns:
+        Tuple[np.ndarray, ...]: (contagem, média, mediana, variância (ddof=1), mínimo, máximo) por grupo.
+    """
+    k = starts.shape[0] - 1
+    count = np.zeros(k, dtype=np.int64)
+    mean = np.full(k, np.nan)
+    median = np.full(k, np.nan)
+    var = np.full(k, np.nan)
+    minimum = np.full(k, np.nan)
+    maximum = np.full(k, np.nan)
+
+    for g in prange(k):
+        buffer = np.empty(starts[g + 1] - starts[g])
+        n = 0
+        m = 0.0
+        m2 = 0.0
+        lo = np.inf
+        hi = -np.inf
+
+        for pos in range(starts[g], starts[g + 1]):
+            value = values[order[pos]]
+            if value != value:
+                continue
+
+            buffer[n] = value
+            n += 1
+            delta = value - m
+            m += delta / n
+            m2 += delta * (value - m)
+            lo = min(lo, value)
+            hi = max(hi, value)
+
+        count[g] = n
+        if n > 0:
+            mean[g] = m
+            median[g] = np.median(buffer[:n])
+            minimum[g] = lo
+            maximum[g] = hi
+        if n > 1:
+            var[g] = m2 / (n - 1)
+
+    return count, mean, median, var, minimum, maximum
@@ -0,0 +1,61 @@
+import numpy as np
+
+from numba import njit, types
+from typing import Tuple
+from modules.numba_utils import F8_1D, F8_2D
+
+
+@njit(types.UniTuple(types.float64[:], 4)(F8_1D, F8_2D), cache=True, error_model='numpy')
+def regression_metrics(y: np.ndarray, P: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcula MSE, R², correlação de Pearson e desvio padrão do erro de vários modelos de uma vez.
+    Previsões ou valores reais constantes resultam em correlação NaN (como no pearsonr), e com y
+    constante o R² é 1.0 se a previsão for perfeita e 0.0 caso contrário (como no r2_score).
+
+    Args:
+        y (np.ndarray): Valores reais, formato (n,).
+        P (np.ndarray): Previsões empilhadas, formato (n_modelos, n).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: (mse, r2, corr, std) por modelo.
+    """
+    n_models, n = P.shape
+    mse = np.empty(n_models)
+    r2 = np.empty(n_models)
+    corr = np.empty(n_models)
+    std = np.empty(n_models)
+
+    y_mean = y.mean()
+    ss_tot = 0.0
+    for j in range(n):
+        ss_tot += (y[j] - y_mean) ** 2
+
+    for i in range(n_models):
+        p_mean = 0.0
+        err_mean = 0.0
+        for j in range(n):
+            p_mean += P[i, j]
+            err_mean += y[j] - P[i, j]
+        p_mean /= n
+        err_mean /= n
+
+        ss_res = 0.0
+        ss_err = 0.0
+        ss_p = 0.0
+        cov = 0.0
+        for j in range(n):
+            err = y[j] - P[i, j]
+            ss_res += err * err
+            ss_err += (err - err_mean) ** 2
+            ss_p += (P[i, j] - p_mean) ** 2
+            cov += (P[i, j] - p_mean) * (y[j] - y_mean)
+
+        mse[i] = ss_res / n
+        if ss_tot > 0.0:
+            r2[i] = 1.0 - ss_res / ss_tot
+        else:
+            r2[i] = 1.0 if ss_res == 0.0 else 0.0
+        corr[i] = cov / np.sqrt(ss_p * ss_tot)
+        std[i] = np.sqrt(ss_err / n)
+
+    return mse, r2, corr, std
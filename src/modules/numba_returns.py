@@ -0,0 +1,27 @@
+import numpy as np
+
+from numba import njit, prange, types
+from modules.numba_utils import F8_2D
+
+
+@njit(types.float64[:, :](F8_2D), parallel=True, cache=True, error_model='numpy')
+def pct_change_2d(prices: np.ndarray) -> np.ndarray:
+    """
+    Variação percentual entre linhas consecutivas de cada coluna, (p[t] - p[t-1]) / p[t-1],
+    em uma única passada. As colunas são processadas em paralelo. Com error_model='numpy',
+    divisões por zero resultam em inf/NaN (como no NumPy) em vez de exceção.
+
+    Args:
+        prices (np.ndarray): Preços alinhados, formato (n_datas, n_colunas).
+
+    Returns:
+        np.ndarray: Retornos, formato (n_datas - 1, n_colunas).
+    """
+    n, m = prices.shape
+    out = np.empty((max(n - 1, 0), m))
+
+    for j in prange(m):
+        for i in range(n - 1):
+            out[i, j] = (prices[i + 1, j] - prices[i, j]) / prices[i, j]
+
+    return out
@@ -0,0 +1,82 @@
+import numpy as np
+
+from numba import njit, types
+from modules.numba_utils import F8_1D
+
+
+ROLLING_WINDOW = 7
+
+
+@njit(types.float64[:](F8_1D), cache=True)
+def rolling_mean_7(x: np.ndarray) -> np.ndarray:
+    """
+    Média móvel de 7 dias com soma acumulada (soma o novo valor e subtrai o mais antigo).
+    Equivale a pd.Series(x).rolling(7).mean(): janelas com NaN resultam em NaN.
+
+    Args:
+        x (np.ndarray): Série de preços.
+
+    Returns:
+        np.ndarray: Média móvel (NaN nas 6 primeiras posições).
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    nan_count = 0
+
+    for i in range(n):
+        value = x[i]
+        if value != value:
+            nan_count += 1
+        else:
+            total += value
+
+        if i >= ROLLING_WINDOW:
+            oldest = x[i - ROLLING_WINDOW]
+            if oldest != oldest:
+                nan_count -= 1
+            else:
+                total -= oldest
+
+        if i >= ROLLING_WINDOW - 1 and nan_count == 0:
+            out[i] = total / ROLLING_WINDOW
+
+    return out
+
+
+@njit(types.float64[:](F8_1D), cache=True)
+def rolling_median_7(x: np.ndarray) -> np.ndarray:
+    """
+    Mediana móvel de 7 dias: cada janela é ordenada por inserção em um buffer fixo de 7 posições.
+    Equivale a pd.Series(x).rolling(7).median(): janelas com NaN resultam em NaN.
+
+    Args:
+        x (np.ndarray): Série de preços.
+
+    Returns:
+        np.ndarray: Mediana móvel (NaN nas 6 primeiras posições).
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    buffer = np.empty(ROLLING_WINDOW)
+
+    for i in range(ROLLING_WINDOW - 1, n):
+        has_nan = False
+
+        for j in range(ROLLING_WINDOW):
+            value = x[i - ROLLING_WINDOW + 1 + j]
+            if value != value:
+                has_nan = True
+                break
+
+            # Insere o valor na posição correta dentro do buffer já ordenado
+            k = j
+            while k > 0 and buffer[k - 1] > value:
+                buffer[k] = buffer[k - 1]
+                k -= 1
+            buffer[k] = value
+
+        if not has_nan:
+            out[i] = buffer[ROLLING_WINDOW // 2]
+
+    return out
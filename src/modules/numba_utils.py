@@ -0,0 +1,14 @@
+from numba import types
+
+
+# Tipos das assinaturas dos kernels Numba, compartilhados pelos módulos numba_*.py.
+# Os kernels declaram a assinatura (compilação antecipada, no import) e usam cache=True:
+# o código compilado fica em __pycache__ e as execuções seguintes apenas o carregam.
+# Por isso as entradas precisam ser float64 (e int64 nos índices de grouped_stats).
+# As entradas são declaradas somente leitura e com layout qualquer ('A'), o que aceita tanto
+# arrays graváveis quanto as views somente leitura devolvidas por Series.to_numpy() (copy-on-write).
+# Cada kernel fica no módulo do seu uso (numba_rolling, numba_metrics, numba_grouped, numba_returns):
+# com o cache vazio, importar um módulo compila apenas os kernels que ele de fato usa.
+F8_1D = types.Array(types.float64, 1, 'A', readonly=True)
+F8_2D = types.Array(types.float64, 2, 'A', readonly=True)
+I8_1D = types.Array(types.int64, 1, 'A', readonly=True)
@@ -1,10 +1,131 @@
 import numpy as np
 
+from typing import Tuple
+from numba import guvectorize, njit, types
 from modules.logging import get_logger
 
 
 logger = get_logger('simulation')
 
+# Valor mínimo razoável para considerar como preço real (evita divisões explosivas)
+MIN_PRICE = 1.0
+
+
+# Os kernels abaixo são compilados pelo Numba. Não usamos fastmath=True pois ele
+# assume a ausência de NaN, e as comparações abaixo dependem da semântica de NaN.
+# Assinaturas explícitas para entradas float32 e float64 (somente leitura, qualquer layout):
+# os preços são lidos no tipo de entrada, mas as contas e o saldo são sempre em float64.
+_F4_1D = types.Array(types.float32, 1, 'A', readonly=True)
+_F8_1D = types.Array(types.float64, 1, 'A', readonly=True)
+_PROFIT_SIGNATURES = [types.Tuple((types.float64, types.int64))(arr, arr, types.float64, types.float64)
+                      for arr in (_F4_1D, _F8_1D)]
+_SERIES_SIGNATURES = [types.float64[:](arr, arr, types.float64, types.float64) for arr in (_F4_1D, _F8_1D)]
+
+
+@njit(_PROFIT_SIGNATURES, cache=True)
+def _simulate_profit_kernel(y_true: np.ndarray, y_pred: np.ndarray,
+                            initial_balance: float, min_price: float) -> Tuple[float, int]:
+    """
+    Laço principal de simulate_profit compilado em código nativo.
+
+    Returns:
+        Tuple[float, int]: (saldo final, quantidade de variações anormais ignoradas).
+    """
+    if y_pred.shape[0] != y_true.shape[0]:
+        raise ValueError("y_true e y_pred devem ter o mesmo tamanho")
+
+    balance = initial_balance
+    anomalies = 0
+
+    for i in range(y_true.shape[0] - 1):
+        today_real = float(y_true[i])
+        tomorrow_real = float(y_true[i + 1])
+        tomorrow_pred = float(y_pred[i + 1])
+
+        # Verificações de sanidade em uma única máscara, sem desvios no laço.
+        # Comparações com NaN são sempre falsas, o que também descarta valores NaN.
+        trade = (today_real > min_price) & (tomorrow_real > min_price) & (tomorrow_pred > today_real)
+        change = tomorrow_real / today_real if today_real > min_price else 1.0
+
+        # Se a mudança for absurda (> 10x em um dia), ignorar
+        anomalies += trade & (change > 10)
+        balance *= change if trade & (change <= 10) else 1.0
+
+    return balance, anomalies
+
+
+@njit(_SERIES_SIGNATURES, cache=True)
+def _simulate_profit_series_kernel(y_true: np.ndarray, y_pred: np.ndarray,
+                                   initial_balance: float, min_price: float) -> np.ndarray:
+    """
+    Laço principal de simulate_profit_series compilado em código nativo.
+
+    Returns:
+        np.ndarray: Saldo em cada dia.
+    """
+    if y_pred.shape[0] != y_true.shape[0]:
+        raise ValueError("y_true e y_pred devem ter o mesmo tamanho")
+
+    n = y_true.shape[0]
+    balances = np.empty(max(n, 1), dtype=np.float64)
+    balance = initial_balance
+    balances[0] = balance
+
+    for i in range(n - 1):
+        today_real = float(y_true[i])
+        tomorrow_real = float(y_true[i + 1])
+        tomorrow_pred = float(y_pred[i + 1])
+
+        trade = (today_real > min_price) & (tomorrow_real > min_price) & (tomorrow_pred > today_real)
+        change = tomorrow_real / today_real if today_real > min_price else 1.0
+
+        balance *= change if trade & (change <= 10) else 1.0
+        balances[i + 1] = balance
+
+    return balances
+
+
+@guvectorize(['(f8[:], f8[:], f8, f8[:])'], '(n),(n),()->()', target='parallel', cache=True)
+def _simulate_profit_gufunc(y_true: np.ndarray, y_pred: np.ndarray, initial_balance: float, out: np.ndarray) -> None:
+    """
+    Versão vetorizada de _simulate_profit_kernel: cada linha (n) é uma simulação independente,
+    e as linhas são distribuídas entre os núcleos.
+    """
+    out[0] = _simulate_profit_kernel(y_true, y_pred, initial_balance, MIN_PRICE)[0]
+
+
+# Versão pré-compilada (AOT) do kernel, gerada por modules/_simulation_aot.py.
+# Sem a extensão nativa, usa o kernel compilado pelo JIT.
+try:
+    from modules.simulation_native import simulate_profit_kernel as _profit_kernel
+except ImportError:
+    _profit_kernel = _simulate_profit_kernel
+
+
+def _check_same_shape(y_true: np.ndarray, y_pred: np.ndarray) -> None:
+    """
+    Garante que valores reais e previstos tenham o mesmo formato (ValueError caso contrário):
+    os kernels leem y_pred nas mesmas posições de y_true.
+    """
+    if y_true.shape != y_pred.shape:
+        raise ValueError(f"y_true e y_pred devem ter o mesmo formato: {y_true.shape} != {y_pred.shape}")
+
+
+def _as_kernel_arrays(y_true: np.ndarray, y_pred: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converte as entradas para arrays contíguos aceitos pelos kernels: float32 se ambas já forem
+    float32 (metade da memória lida), float64 caso contrário.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (y_true, y_pred) convertidos.
+    """
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    _check_same_shape(y_true, y_pred)
+    dtype = np.float32 if y_true.dtype == np.float32 and y_pred.dtype == np.float32 else np.float64
+
+    return np.ascontiguousarray(y_true, dtype=dtype), np.ascontiguousarray(y_pred, dtype=dtype)
+
 
 def simulate_profit(y_true: np.ndarray, y_pred: np.ndarray, initial_balance: float = 1000.0) -> float:
     """
@@ -22,31 +143,36 @@ def simulate_profit(y_true: np.ndarray, y_pred: np.ndarray, initial_balance: flo
     Returns:
         float: Saldo final ao fim da simulação.
     """
+    y_true, y_pred = _as_kernel_arrays(y_true, y_pred)
 
-    balance = initial_balance
-    min_price = 1.0  # Valor mínimo razoável para considerar como preço real (evita divisões explosivas)
+    # A versão AOT só existe para float64; entradas float32 usam o kernel JIT
+    kernel = _profit_kernel if y_true.dtype == np.float64 else _simulate_profit_kernel
+    balance, anomalies = kernel(y_true, y_pred, float(initial_balance), MIN_PRICE)
 
-    for i in range(len(y_true) - 1):
-        today_real = y_true[i]
-        tomorrow_real = y_true[i + 1]
-        tomorrow_pred = y_pred[i + 1]
+    if anomalies:
+        logger.warning("%d variações anormais (> 10x em um dia) ignoradas na simulação", anomalies)
 
-        # Verificações de sanidade
-        if (np.isnan(today_real) or np.isnan(tomorrow_real) or np.isnan(tomorrow_pred)):
-            continue
-        if (today_real <= min_price or tomorrow_real <= min_price):
-            continue
-        if tomorrow_pred > today_real:
-            change = tomorrow_real / today_real
+    return round(balance, 2)
 
-            # Se a mudança for absurda (> 10x em um dia), ignorar
-            if change > 10:
-                logger.warning(f"Variação anormal ignorada: {change:.2f}x no dia {i}")
-                continue
 
-            balance *= change
+def simulate_profit_batch(y_true: np.ndarray, y_pred: np.ndarray, initial_balance: float = 1000.0) -> np.ndarray:
+    """
+    Executa várias simulações de lucro (mesma lógica de simulate_profit) em uma única chamada,
+    uma por linha, em paralelo. Variações anormais são ignoradas, mas não registradas no log.
 
-    return round(balance, 2)
+    Args:
+        y_true (np.ndarray): Valores reais de fechamento, formato (n_simulações, n_dias).
+        y_pred (np.ndarray): Valores previstos de fechamento, formato (n_simulações, n_dias).
+        initial_balance (float): Saldo inicial em USD.
+
+    Returns:
+        np.ndarray: Saldo final de cada simulação, arredondado em 2 casas.
+    """
+    y_true = np.ascontiguousarray(y_true, dtype=np.float64)
+    y_pred = np.ascontiguousarray(y_pred, dtype=np.float64)
+    _check_same_shape(y_true, y_pred)
+
+    return np.round(_simulate_profit_gufunc(y_true, y_pred, float(initial_balance)), 2)
 
 
 def simulate_profit_series(y_true: np.ndarray, y_pred: np.ndarray, initial_balance: float = 1000.0) -> list:
@@ -62,33 +188,8 @@ def simulate_profit_series(y_true: np.ndarray, y_pred: np.ndarray, initial_balan
     Returns:
         list: Lista com o saldo em cada dia.
     """
-    balance = initial_balance
-    balances = [balance]
-    min_price = 1.0
-
-    for i in range(len(y_true) - 1):
-        today_real = y_true[i]
-        tomorrow_real = y_true[i + 1]
-        tomorrow_pred = y_pred[i + 1]
-
-        if np.isnan(today_real) or np.isnan(tomorrow_real) or np.isnan(tomorrow_pred):
-            balances.append(balance)
-            continue
-
-        if today_real <= min_price or tomorrow_real <= min_price:
-            balances.append(balance)
-            continue
-
-        if tomorrow_pred > today_real:
-            change = tomorrow_real / today_real
-            if change > 10:
-                balances.append(balance)
-                continue
-            balance *= change
-
-        balances.append(balance)
-
-    return balances
+    y_true, y_pred = _as_kernel_arrays(y_true, y_pred)
+    return _simulate_profit_series_kernel(y_true, y_pred, float(initial_balance), MIN_PRICE).tolist()
 
 
 def simulate_hold_strategy(y_true: np.ndarray, initial_balance: float = 1000.0) -> np.ndarray:
@@ -1,16 +1,121 @@
-import matplotlib.pyplot as plt
+import matplotlib
 import numpy as np
 import pandas as pd
-import seaborn as sns
 import os
 import math
+import weakref
 
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 from modules.logging import get_logger
+from modules.numba_rolling import rolling_mean_7, rolling_median_7
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+
+# Backend sem interface gráfica: os gráficos são apenas salvos em arquivo.
+# O pyplot, a Figure e o SciPy são importados dentro das funções que os usam: quem só importa
+# o módulo (ex.: coleta dos testes) não paga o custo desses imports.
+matplotlib.use('Agg')
 
 
 logger = get_logger('visualizations')
 
+MAX_PLOT_POINTS = 5000
+
+# Parâmetros comuns de savefig: PNG com compressão nível 1 (arquivo um pouco maior, gravação bem mais rápida)
+SAVE_KW = {'pil_kwargs': {'compress_level': 1}}
+
+
+def _downsample(y: np.ndarray, max_pts: int = MAX_PLOT_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduz uma série longa a no máximo max_pts pontos, amostrando com passo fixo.
+
+    Args:
+        y (np.ndarray): Valores da série.
+        max_pts (int): Quantidade máxima de pontos desenhados.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Posições originais (eixo x) e valores amostrados.
+    """
+    y = np.asarray(y)
+    step = max(1, math.ceil(len(y) / max_pts))
+    return np.arange(0, len(y), step), y[::step]
+
+
+# Estatísticas de resumo por DataFrame (chave: id), reaproveitadas entre os gráficos de linha
+_summary_cache: Dict[int, Tuple[np.ndarray, np.ndarray, float]] = {}
+
+
+def _summary_stats(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Calcula uma única vez por DataFrame a média móvel 7d, a mediana móvel 7d e a moda do fechamento.
+    A entrada do cache é descartada quando o DataFrame deixa de existir.
+
+    Args:
+        df (pd.DataFrame): DataFrame da criptomoeda com a coluna 'close'.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, float]: Média móvel 7d, mediana móvel 7d e moda.
+    """
+    key = id(df)
+    if key not in _summary_cache:
+        close = df['close'].to_numpy(dtype=np.float64)
+        media_7d = rolling_mean_7(close)
+        mediana_7d = rolling_median_7(close)
+        # Moda pelo NumPy (valores ordenados + contagens); em empate fica o menor valor, como em Series.mode()
+        valores, contagens = np.unique(close[~np.isnan(close)], return_counts=True)
+        moda = float(valores[contagens.argmax()])
+
+        _summary_cache[key] = (media_7d, mediana_7d, moda)
+        weakref.finalize(df, _summary_cache.pop, key, None)
+
+    return _summary_cache[key]
+
+
+def _save_figure(fig: 'Figure', caminho: str, dpi: int) -> None:
+    """
+    Salva a figura em PNG. Com a variável de ambiente SKIP_RENDER igual a 1, true ou yes, grava apenas
+    um arquivo vazio no caminho: todo o gráfico é montado, mas a rasterização e a codificação PNG são puladas.
+
+    Args:
+        fig (Figure): Figura a ser salva.
+        caminho (str): Caminho do arquivo de saída.
+        dpi (int): Resolução da imagem (dots per inch).
+    """
+    if os.environ.get('SKIP_RENDER', '').strip().lower() in {'1', 'true', 'yes'}:
+        open(caminho, 'wb').close()
+        return
+
+    fig.savefig(caminho, dpi=dpi, **SAVE_KW)
+
+
+# Figuras reaproveitadas entre chamadas (uma por processo), evitando recriar figura/canvas a cada gráfico
+_cached_axes: Dict[str, Tuple['Figure', 'Axes']] = {}
+
+
+def _get_axes(nome: str, figsize: Tuple[float, float]) -> Tuple['Figure', 'Axes']:
+    """
+    Retorna uma figura com um único eixo, criada na primeira chamada e limpa nas seguintes.
+    A figura não é gerenciada pelo pyplot, então plt.close() não a descarta.
+
+    Args:
+        nome (str): Identificador da figura no cache.
+        figsize (Tuple[float, float]): Tamanho da figura em polegadas.
+
+    Returns:
+        Tuple[Figure, Axes]: Figura e eixo prontos para desenhar.
+    """
+    if nome not in _cached_axes:
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize, layout='constrained')
+        _cached_axes[nome] = (fig, fig.add_subplot())
+
+    fig, ax = _cached_axes[nome]
+    ax.cla()
+    return fig, ax
+
 
 def plot_real_vs_pred(y_true: np.ndarray, y_pred: np.ndarray, title: str = "Real vs. Previsto", dpi: int = 150) -> None:
     """
@@ -22,17 +127,21 @@ def plot_real_vs_pred(y_true: np.ndarray, y_pred: np.ndarray, title: str = "Real
         title (str): Título do gráfico.
         dpi (int): Resolução da imagem (dots per inch).
     """
-    plt.figure(figsize=(12, 6))
-    plt.plot(y_true, label="Real", linewidth=2)
-    plt.plot(y_pred, label="Previsto", linestyle="--")
+    import matplotlib.pyplot as plt
+
+    # Séries longas são amostradas e rasterizadas para reduzir o custo de renderização
+    rasterized = len(y_true) > MAX_PLOT_POINTS
+
+    plt.figure(figsize=(12, 6), layout='constrained')
+    plt.plot(*_downsample(y_true), label="Real", linewidth=2, rasterized=rasterized, snap=True)
+    plt.plot(*_downsample(y_pred), label="Previsto", linestyle="--", rasterized=rasterized, snap=True)
     plt.title(title)
     plt.xlabel("Tempo (dias)")
     plt.ylabel("Preço de Fechamento")
     plt.legend()
     plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(f"figures/{title.lower().replace(' ', '_')}.png", dpi=dpi)
-    plt.show()
+    _save_figure(plt.gcf(), f"figures/{title.lower().replace(' ', '_')}.png", dpi)
+    plt.close()
 
 
 def plot_balance_evolution(balance_dict: dict, title: str = "Evolução do Lucro", dpi: int = 150) -> None:
@@ -44,19 +153,47 @@ def plot_balance_evolution(balance_dict: dict, title: str = "Evolução do Lucro
         title (str): Título do gráfico.
         dpi (int): Resolução da imagem (dots per inch).
     """
-    plt.figure(figsize=(12, 6))
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6), layout='constrained')
 
     for nome_modelo, saldo_diario in balance_dict.items():
-        plt.plot(saldo_diario, label=nome_modelo)
+        # Séries longas são amostradas e rasterizadas para reduzir o custo de renderização
+        rasterized = len(saldo_diario) > MAX_PLOT_POINTS
+        plt.plot(*_downsample(saldo_diario), label=nome_modelo, rasterized=rasterized, snap=True)
 
     plt.title(title)
     plt.xlabel("Dias")
     plt.ylabel("Saldo ($)")
     plt.legend()
     plt.grid(True)
-    plt.tight_layout()
-    plt.savefig("figures/evolucao_saldo_modelos.png", dpi=dpi)
-    plt.show()
+    _save_figure(plt.gcf(), "figures/evolucao_saldo_modelos.png", dpi)
+    plt.close()
+
+
+def _box_stats(arr: np.ndarray, label: str) -> Optional[dict]:
+    """
+    Calcula as estatísticas de um boxplot (quartis, whiskers a 1,5 x IQR e outliers) no formato de Axes.bxp.
+
+    Args:
+        arr (np.ndarray): Preços de fechamento (NaN e infinitos são ignorados).
+        label (str): Rótulo da caixa.
+
+    Returns:
+        Optional[dict]: Estatísticas da caixa (med, q1, q3, whislo, whishi, fliers, label),
+            ou None se não houver nenhum preço válido.
+    """
+    arr = arr[np.isfinite(arr)]
+    if arr.size == 0:
+        return None
+
+    q1, med, q3 = np.percentile(arr, [25, 50, 75])
+    iqr = q3 - q1
+    whislo = arr[arr >= q1 - 1.5 * iqr].min()
+    whishi = arr[arr <= q3 + 1.5 * iqr].max()
+    fliers = arr[(arr < whislo) | (arr > whishi)]
+
+    return {'med': med, 'q1': q1, 'q3': q3, 'whislo': whislo, 'whishi': whishi, 'fliers': fliers, 'label': label}
 
 
 def salvar_boxplot_precos(data_dict: dict, output_path: str, dpi: int) -> None:
@@ -69,38 +206,34 @@ def salvar_boxplot_precos(data_dict: dict, output_path: str, dpi: int) -> None:
         dpi (int): Resolução da imagem (dots per inch).
     """
     logger.info("Iniciando geração do boxplot...")
-    logger.info(f"Criptomoedas disponíveis: {list(data_dict.keys())}")
-
-    # Prepara dados para o boxplot
-    boxplot_data = []
-    crypto_names = []
-
-    for crypto, df in data_dict.items():
-        boxplot_data.extend(df['close'].values)
-        crypto_names.extend([crypto] * len(df))
-
-    logger.info(f"Total de dados coletados para o boxplot: {len(boxplot_data)}")
-
-    df_boxplot = pd.DataFrame({
-        'Crypto': crypto_names,
-        'Close': boxplot_data
-    })
-
-    logger.info(f"DataFrame do boxplot criado com shape: {df_boxplot.shape}")
-
-    plt.figure(figsize=(12, 6))
-    sns.boxplot(data=df_boxplot, x='Crypto', y='Close')
-    plt.title("Boxplot do Preço de Fechamento - 10 Criptomoedas")
-    plt.grid(True)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    logger.info("Criptomoedas disponíveis: %s", list(data_dict.keys()))
+
+    # Quartis, whiskers (1,5 x IQR) e outliers calculados por moeda; o matplotlib só desenha
+    # Moedas sem nenhum preço válido não têm caixa e ficam fora do gráfico
+    box_stats = [_box_stats(df['close'].to_numpy(dtype=np.float64), crypto) for crypto, df in data_dict.items()]
+    box_stats = [stats for stats in box_stats if stats is not None]
+    if not box_stats:
+        logger.warning("Nenhum preço válido para o boxplot; gráfico não gerado.")
+        return
+
+    logger.info("Total de dados coletados para o boxplot: %d", sum(len(df) for df in data_dict.values()))
+
+    fig, ax = _get_axes('boxplot', figsize=(12, 6))
+    boxes = ax.bxp(box_stats, showfliers=True, patch_artist=True)
+    cores = matplotlib.rcParams['axes.prop_cycle'].by_key()['color']
+    for i, patch in enumerate(boxes['boxes']):
+        patch.set_facecolor(cores[i % len(cores)])
+    ax.set_xlabel("Crypto")
+    ax.set_ylabel("Close")
+    ax.set_title("Boxplot do Preço de Fechamento - 10 Criptomoedas")
+    ax.grid(True)
+    ax.tick_params(axis='x', labelrotation=45)
 
     os.makedirs(output_path, exist_ok=True)
     caminho_fig = os.path.join(output_path, "boxplot_fechamento.png")
-    plt.savefig(caminho_fig, dpi=dpi)
-    plt.close()
+    _save_figure(fig, caminho_fig, dpi)
 
-    logger.info(f"Boxplot salvo em: {caminho_fig}")
+    logger.info("Boxplot salvo em: %s", caminho_fig)
 
 
 def salvar_histograma_precos(data_dict: dict, output_path: str, dpi: int) -> None:
@@ -112,24 +245,46 @@ def salvar_histograma_precos(data_dict: dict, output_path: str, dpi: int) -> Non
         output_path (str): Caminho para salvar a imagem.
         dpi (int): Resolução da imagem (dots per inch).
     """
-    # Prepara dados para o histograma
-    all_prices = []
-    for crypto, df in data_dict.items():
-        all_prices.extend(df['close'].values)
-
-    plt.figure(figsize=(10, 5))
-    sns.histplot(data=all_prices, kde=True, bins=50)
-    plt.title("Distribuição dos Preços de Fechamento")
-    plt.xlabel("Preço")
-    plt.ylabel("Frequência")
-    plt.grid(True)
+    # Prepara dados para o histograma em um único array contíguo, apenas com valores finitos
+    if not data_dict:
+        logger.warning("Nenhuma criptomoeda para o histograma; gráfico não gerado.")
+        return
+
+    all_prices = np.concatenate([df['close'].to_numpy() for df in data_dict.values()])
+    all_prices = all_prices[np.isfinite(all_prices)]
+    if all_prices.size == 0:
+        logger.warning("Nenhum preço válido para o histograma; gráfico não gerado.")
+        return
+
+    # Valores inteiros em faixa estreita são discretos: bins automáticos e sem KDE
+    discreto = all_prices.dtype.kind in 'iu' and np.ptp(all_prices) < 1000
+
+    # Contagens calculadas direto pelo NumPy e desenhadas como barras
+    counts, edges = np.histogram(all_prices, bins='auto' if discreto else 50)
+    widths = np.diff(edges)
+
+    fig, ax = _get_axes('histograma', figsize=(10, 5))
+    ax.bar(edges[:-1], counts, width=widths, align='edge', alpha=0.6, edgecolor='white')
+
+    # KDE ajustada em uma subamostra e avaliada em uma grade reduzida, na escala das contagens.
+    # Sem variância a KDE não é definida (matriz de covariância singular), então é omitida.
+    if not discreto and np.ptp(all_prices) > 0:
+        from scipy.stats import gaussian_kde
+
+        rng = np.random.default_rng(42)
+        sample = rng.choice(all_prices, size=min(len(all_prices), 50_000), replace=False)
+        grid = np.linspace(edges[0], edges[-1], 200)
+        ax.plot(grid, gaussian_kde(sample)(grid) * len(all_prices) * widths[0])
+    ax.set_title("Distribuição dos Preços de Fechamento")
+    ax.set_xlabel("Preço")
+    ax.set_ylabel("Frequência")
+    ax.grid(True)
 
     os.makedirs(output_path, exist_ok=True)
     caminho_fig = os.path.join(output_path, "histograma_fechamento.png")
-    plt.savefig(caminho_fig, dpi=dpi)
-    plt.close()
+    _save_figure(fig, caminho_fig, dpi)
 
-    logger.info(f"Histograma salvo em: {caminho_fig}")
+    logger.info("Histograma salvo em: %s", caminho_fig)
 
 
 def salvar_linha_media_mediana_moda(data_dict: dict, cripto: str, output_path: str, dpi: int) -> None:
@@ -142,29 +297,46 @@ def salvar_linha_media_mediana_moda(data_dict: dict, cripto: str, output_path: s
         output_path (str): Pasta para salvar o gráfico.
         dpi (int): Resolução da imagem (dots per inch).
     """
-    df = data_dict[cripto].copy()
-    df['media_7d'] = df['close'].rolling(7).mean()
-    df['mediana_7d'] = df['close'].rolling(7).median()
-    moda = df['close'].mode().iloc[0]
-    df['moda'] = moda
-
-    plt.figure(figsize=(12, 6))
-    plt.plot(df.index, df['close'], label="Fechamento")
-    plt.plot(df.index, df['media_7d'], label="Média 7d")
-    plt.plot(df.index, df['mediana_7d'], label="Mediana 7d")
-    plt.axhline(moda, color='gray', linestyle='--', label=f"Moda: {moda:.2f}")
-    plt.title(f"{cripto} - Fechamento com Média, Mediana e Moda")
-    plt.xlabel("Data")
-    plt.ylabel("Preço")
-    plt.legend()
-    plt.grid(True)
+    df = data_dict[cripto]
+    media_7d, mediana_7d, moda = _summary_stats(df)
+
+    # Apenas a coluna 'close' é lida; as estatísticas móveis são arrays temporários
+    salvar_linha_resumo(df['close'], media_7d, mediana_7d, moda, cripto, output_path, dpi)
+
+
+def salvar_linha_resumo(close: pd.Series, media_7d: np.ndarray, mediana_7d: np.ndarray, moda: float,
+                        cripto: str, output_path: str, dpi: int) -> None:
+    """
+    Desenha e salva o gráfico de linha de salvar_linha_media_mediana_moda a partir das estatísticas
+    já calculadas (ex.: no processo principal, antes de enviar o gráfico a outro processo).
+
+    Args:
+        close (pd.Series): Preços de fechamento, indexados por data.
+        media_7d (np.ndarray): Média móvel de 7 dias.
+        mediana_7d (np.ndarray): Mediana móvel de 7 dias.
+        moda (float): Moda do fechamento.
+        cripto (str): Nome da criptomoeda.
+        output_path (str): Pasta para salvar o gráfico.
+        dpi (int): Resolução da imagem (dots per inch).
+    """
+    idx = close.index
+
+    fig, ax = _get_axes('linha_resumo', figsize=(12, 6))
+    ax.plot(idx, close.to_numpy(), label="Fechamento")
+    ax.plot(idx, media_7d, label="Média 7d")
+    ax.plot(idx, mediana_7d, label="Mediana 7d")
+    ax.axhline(moda, color='gray', linestyle='--', label=f"Moda: {moda:.2f}")
+    ax.set_title(f"{cripto} - Fechamento com Média, Mediana e Moda")
+    ax.set_xlabel("Data")
+    ax.set_ylabel("Preço")
+    ax.legend()
+    ax.grid(True)
 
     os.makedirs(output_path, exist_ok=True)
     caminho_fig = os.path.join(output_path, f"{cripto}_linha_resumo.png")
-    plt.savefig(caminho_fig, dpi=dpi)
-    plt.close()
+    _save_figure(fig, caminho_fig, dpi)
 
-    logger.info(f"Gráfico linha salvo para {cripto} em: {caminho_fig}")
+    logger.info("Gráfico linha salvo para %s em: %s", cripto, caminho_fig)
 
 
 def salvar_multiplos_graficos_linha(dados: Dict[str, pd.DataFrame], output_path: str, dpi: int) -> None:
@@ -180,24 +352,25 @@ def salvar_multiplos_graficos_linha(dados: Dict[str, pd.DataFrame], output_path:
         output_path (str): Pasta para salvar o gráfico
         dpi (int): Resolução da imagem (dots per inch).
     """
+    import matplotlib.pyplot as plt
 
     n = len(dados)
     cols = 2
     rows = math.ceil(n / cols)
 
-    fig, axes = plt.subplots(rows, cols, figsize=(16, 4 * rows), sharex=False)
+    fig, axes = plt.subplots(rows, cols, figsize=(16, 4 * rows), sharex=False, layout='constrained')
     axes = axes.flatten()
 
     for i, (coin, df) in enumerate(dados.items()):
         ax = axes[i]
-        df_plot = df.copy()
-        df_plot['media_7d'] = df_plot['close'].rolling(7).mean()
-        df_plot['mediana_7d'] = df_plot['close'].rolling(7).median()
-        moda = df_plot['close'].mode().iloc[0]
-
-        ax.plot(df_plot.index, df_plot['close'], label='Fechamento')
-        ax.plot(df_plot.index, df_plot['media_7d'], label='Média 7d')
-        ax.plot(df_plot.index, df_plot['mediana_7d'], label='Mediana 7d')
+        # Reaproveita as estatísticas já calculadas por salvar_linha_media_mediana_moda
+        media_7d, mediana_7d, moda = _summary_stats(df)
+        close = df['close']
+        idx = close.index
+
+        ax.plot(idx, close.to_numpy(), label='Fechamento')
+        ax.plot(idx, media_7d, label='Média 7d')
+        ax.plot(idx, mediana_7d, label='Mediana 7d')
         ax.axhline(moda, color='gray', linestyle='--', label=f'Moda: {moda:.2f}')
         ax.set_title(coin)
         ax.legend()
@@ -207,29 +380,33 @@ def salvar_multiplos_graficos_linha(dados: Dict[str, pd.DataFrame], output_path:
     for j in range(i+1, len(axes)):
         fig.delaxes(axes[j])
 
-    plt.tight_layout()
     os.makedirs(output_path, exist_ok=True)
     fig_path = os.path.join(output_path, "linhas_resumo_todas.png")
-    plt.savefig(fig_path, dpi=dpi)
+    _save_figure(fig, fig_path, dpi)
     plt.close()
 
-    logger.info(f"Subplots salvos em {fig_path}")
+    logger.info("Subplots salvos em %s", fig_path)
 
 
-def salvar_grafico_variabilidade(df_all: pd.DataFrame, output_path: str) -> None:
+def salvar_grafico_variabilidade(resumo: pd.DataFrame, output_path: str) -> None:
     """
     Salva gráfico de barras com o desvio padrão de cada criptomoeda usando escala logarítmica.
 
     Args:
-        df_all (pd.DataFrame): DataFrame com coluna 'Cripto' e 'close'
+        resumo (pd.DataFrame): Resumo estatístico com colunas 'Cripto' e 'std' (gerado em analise_estatistica)
         output_path (str): Pasta onde salvar o gráfico
     """
 
+    # Import local: o seaborn só é usado aqui, e o pipeline de previsão não precisa carregá-lo
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     try:
-        variabilidade = df_all.groupby("Cripto")["close"].std()
+        # O desvio padrão já foi calculado no resumo; não é preciso reagrupar os dados brutos
+        variabilidade = resumo.set_index("Cripto")["std"]
         variabilidade = variabilidade[variabilidade > 0].sort_values(ascending=False)
 
-        fig, ax = plt.subplots(figsize=(10, 5))
+        fig, ax = plt.subplots(figsize=(10, 5), layout='constrained')
         sns.barplot(x=variabilidade.index, y=variabilidade.values, ax=ax)
         ax.set_yscale("log")  # ✅ ESCALA LOG APLICADA CORRETAMENTE
         ax.set_title("Variabilidade (Desvio Padrão) por Criptomoeda - Escala Log")
@@ -239,9 +416,9 @@ def salvar_grafico_variabilidade(df_all: pd.DataFrame, output_path: str) -> None
 
         os.makedirs(output_path, exist_ok=True)
         fig_path = os.path.join(output_path, "variabilidade_barras.png")
-        fig.savefig(fig_path, dpi=150)
+        _save_figure(fig, fig_path, 150)
         plt.close()
 
-        logger.info(f"Gráfico de variabilidade com escala logarítmica salvo em {fig_path}")
+        logger.info("Gráfico de variabilidade com escala logarítmica salvo em %s", fig_path)
     except Exception as e:
-        logger.error(f"Erro ao gerar gráfico de variabilidade: {e}")
+        logger.error("Erro ao gerar gráfico de variabilidade: %s", e)
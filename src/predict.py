@@ -1,16 +1,13 @@
 import numpy as np
-import matplotlib.pyplot as plt
-
-from sklearn.metrics import mean_squared_error, r2_score
-from scipy.stats import pearsonr
 
 from modules.logging import get_logger
 from modules.data_load import load_all_cryptos
+from modules.numba_metrics import regression_metrics
 from modules.simulation import simulate_profit, simulate_profit_series
-from modules.visualizations import plot_real_vs_pred, plot_balance_evolution
+from modules.visualizations import plot_real_vs_pred, plot_balance_evolution, _save_figure
 from modules.models import (
     prepare_features,
-    train_mlp_model,
+    train_mlp_model_cached,
     evaluate_model,
     split_data,
     train_linear_model,
@@ -31,13 +28,13 @@ def run_prediction(crypto: str, kfold: int, window: int) -> None:
         dados = load_all_cryptos()
 
         if crypto not in dados:
-            logger.error(f"Criptomoeda {crypto} não encontrada no dataset.")
+            logger.error("Criptomoeda %s não encontrada no dataset.", crypto)
             print(f"Erro: Criptomoeda {crypto} não disponível.")
             return
 
         df = dados[crypto]
         if 'close' not in df.columns:
-            logger.error(f"Coluna 'close' não encontrada nos dados de {crypto}.")
+            logger.error("Coluna 'close' não encontrada nos dados de %s.", crypto)
             print("Erro: Coluna 'close' ausente no arquivo.")
             return
 
@@ -57,7 +54,7 @@ def run_prediction(crypto: str, kfold: int, window: int) -> None:
         X_train, X_test, y_train, y_test = split_data(X, y, test_size=0.2)
 
         # Treina o modelo com K-Fold no treino
-        model = train_mlp_model(X_train, y_train, k=kfold)
+        model = train_mlp_model_cached(X_train, y_train, k=kfold)
 
         if model is None:
             print("Erro durante o treinamento do modelo.")
@@ -85,6 +82,9 @@ def run_prediction(crypto: str, kfold: int, window: int) -> None:
 
 
 def run_comparison(crypto: str):
+    # Import local: o pyplot só é usado no diagrama de dispersão, e os demais comandos não precisam carregá-lo
+    import matplotlib.pyplot as plt
+
     dados = load_all_cryptos()
     df = dados[crypto]
 
@@ -94,7 +94,7 @@ def run_comparison(crypto: str):
     y_train, y_test = y[: -30], y[-30:]
 
     # Treinando os modelos
-    mlp = train_mlp_model(X_train, y_train, k=5)
+    mlp = train_mlp_model_cached(X_train, y_train, k=5)
     linear = train_linear_model(X_train, y_train)
     poly_models = train_polynomial_models(X_train, y_train)
 
@@ -119,7 +119,7 @@ def run_comparison(crypto: str):
     plot_balance_evolution(saldos, title="Evolução do Lucro - Modelos")
 
     # Diagrama de dispersão
-    plt.figure(figsize=(10, 6))
+    plt.figure(figsize=(10, 6), layout='constrained')
     for nome, y_pred in preds.items():
         plt.scatter(y_test, y_pred, label=nome, alpha=0.6)
     plt.xlabel("Valor Real")
@@ -127,33 +127,33 @@ def run_comparison(crypto: str):
     plt.title("Diagrama de Dispersão - Todos os Modelos")
     plt.legend()
     plt.grid(True)
-    plt.tight_layout()
-    plt.savefig("figures/diagrama_dispersao_modelos.png", dpi=150)
-    plt.show()
+    _save_figure(plt.gcf(), "figures/diagrama_dispersao_modelos.png", 150)
+    plt.close()
 
     # Métricas e equações
+    # Empilha as previsões (n_modelos x n) e calcula todas as métricas em um único kernel compilado
+    nomes = list(preds)
+    y_true = np.asarray(y_test, dtype=np.float64)
+    P = np.stack([np.asarray(preds[nome], dtype=np.float64) for nome in nomes])
+    mse, r2, corr, std_error = regression_metrics(y_true, P)
+
     print("\nComparação dos Modelos:\n")
     comparacoes = []
-    for nome, y_pred in preds.items():
-        mse = mean_squared_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
-        std_error = np.std(y_test - y_pred)
-        corr, _ = pearsonr(y_test, y_pred)
-
+    for i, nome in enumerate(nomes):
         if "Poly" not in nome:
-            coef, intercept = np.polyfit(y_test, y_pred, 1)
+            coef, intercept = np.polyfit(y_true, P[i], 1)
             eq = f"y = {coef:.4f} * x + {intercept:.4f}"
         else:
             eq = "Equação polinomial"
 
         print(f"Modelo: {nome}")
-        print(f"  - MSE          : {mse:.4f}")
-        print(f"  - R²           : {r2:.4f}")
-        print(f"  - Correlação   : {corr:.4f}")
+        print(f"  - MSE          : {mse[i]:.4f}")
+        print(f"  - R²           : {r2[i]:.4f}")
+        print(f"  - Correlação   : {corr[i]:.4f}")
         print(f"  - Equação      : {eq}")
-        print(f"  - Erro Padrão  : {std_error:.4f}\n")
+        print(f"  - Erro Padrão  : {std_error[i]:.4f}\n")
 
-        comparacoes.append((nome, mse, std_error))
+        comparacoes.append((nome, mse[i], std_error[i]))
 
     # Fazendo a comparação final entre MLP e o melhor modelo
     comparacoes.sort(key=lambda x: x[1])  # ordena por MSE
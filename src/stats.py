@@ -1,13 +1,21 @@
+import os
+import multiprocessing
+import numpy as np
 import pandas as pd
 
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+
 from modules.data_load import load_all_cryptos
 from modules.logging import get_logger
+from modules.numba_grouped import grouped_stats
 from modules.visualizations import (
     salvar_boxplot_precos,
     salvar_histograma_precos,
-    salvar_linha_media_mediana_moda,
+    salvar_linha_resumo,
     salvar_multiplos_graficos_linha,
-    salvar_grafico_variabilidade
+    salvar_grafico_variabilidade,
+    _summary_stats
 )
 
 logger = get_logger('stats')
@@ -22,15 +30,32 @@ def analise_estatistica(df: pd.DataFrame) -> None:
     """
     logger.info("Iniciando análise estatística...")
 
-    # Cálculo das estatísticas
-    resumo = df.groupby('Cripto')['close'].agg(
-        media='mean',
-        mediana='median',
-        std='std',
-        variancia='var',
-        minimo='min',
-        maximo='max'
-    ).reset_index()
+    # Cálculo das estatísticas em um kernel Numba sobre os códigos da coluna categórica 'Cripto'
+    cripto = df['Cripto']
+    if not isinstance(cripto.dtype, pd.CategoricalDtype):
+        cripto = cripto.astype('category')
+    codigos = cripto.cat.codes.to_numpy()
+    categorias = cripto.cat.categories
+    ordem = np.argsort(codigos, kind='stable')
+    inicios = np.zeros(len(categorias) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codigos[codigos >= 0], minlength=len(categorias)), out=inicios[1:])
+    # Códigos -1 (valores ausentes em 'Cripto') ficam no início da ordenação e são ignorados
+    ordem = ordem[len(codigos) - inicios[-1]:]
+
+    contagem, media, mediana, variancia, minimo, maximo = grouped_stats(
+        df['close'].to_numpy(dtype=np.float64), ordem, inicios
+    )
+
+    observadas = contagem > 0
+    resumo = pd.DataFrame({
+        'Cripto': categorias[observadas],
+        'media': media[observadas],
+        'mediana': mediana[observadas],
+        'std': np.sqrt(variancia[observadas]),
+        'variancia': variancia[observadas],
+        'minimo': minimo[observadas],
+        'maximo': maximo[observadas],
+    })
 
     # Cálculo de amplitude e coeficiente de variação (CV)
     resumo['amplitude'] = resumo['maximo'] - resumo['minimo']
@@ -41,7 +66,7 @@ def analise_estatistica(df: pd.DataFrame) -> None:
     resumo.to_csv("figures/resumo_estatistico.csv", index=False)
 
     # Gráfico de variabilidade
-    salvar_grafico_variabilidade(df, "figures")
+    salvar_grafico_variabilidade(resumo[['Cripto', 'std']], "figures")
 
     # Impressão com formatação
     with pd.option_context('display.float_format', '{:.4f}'.format):
@@ -49,17 +74,31 @@ def analise_estatistica(df: pd.DataFrame) -> None:
         print(resumo[['Cripto', 'media', 'mediana', 'std', 'variancia', 'amplitude', 'coef_var']])
 
         print("\nTop 3 moedas com maior desvio padrão:")
-        print(resumo.sort_values(by='std', ascending=False)[['Cripto', 'std']].head(3))
+        print(resumo.nlargest(3, 'std')[['Cripto', 'std']])
 
         print("\nTop 3 moedas com maior amplitude:")
-        print(resumo.sort_values(by='amplitude', ascending=False)[['Cripto', 'amplitude']].head(3))
+        print(resumo.nlargest(3, 'amplitude')[['Cripto', 'amplitude']])
 
         print("\nTop 3 moedas com maior coeficiente de variação (CV):")
-        print(resumo.sort_values(by='coef_var', ascending=False)[['Cripto', 'coef_var']].head(3))
+        print(resumo.nlargest(3, 'coef_var')[['Cripto', 'coef_var']])
 
     logger.info("Resumo estatístico calculado e exibido com sucesso.")
 
 
+def _plot_one(args: Tuple[str, pd.Series, np.ndarray, np.ndarray, float, str, int]) -> None:
+    """
+    Gera o gráfico de linha de uma criptomoeda a partir das estatísticas já calculadas. Fica no nível
+    do módulo para poder ser enviada (pickle) aos processos do ProcessPoolExecutor.
+
+    Args:
+        args (Tuple[str, pd.Series, np.ndarray, np.ndarray, float, str, int]): (criptomoeda, fechamento,
+            média 7d, mediana 7d, moda, pasta de saída, dpi).
+    """
+    crypto, close, media_7d, mediana_7d, moda, output_path, dpi = args
+    logger.info("Gerando gráfico para %s...", crypto)
+    salvar_linha_resumo(close, media_7d, mediana_7d, moda, crypto, output_path, dpi)
+
+
 def run_descriptive_analysis(dpi: int) -> None:
     """
     Executa a análise descritiva de todas as criptomoedas.
@@ -70,11 +109,18 @@ def run_descriptive_analysis(dpi: int) -> None:
     """
     try:
         dados = load_all_cryptos("data/")
-        logger.info(f"Chaves disponíveis: {dados.keys()}")
-
-        df_all = pd.concat([
-            df.assign(Cripto=coin) for coin, df in dados.items()
-        ])
+        logger.info("Chaves disponíveis: %s", dados.keys())
+
+        # Monta apenas as colunas usadas na análise: 'close' em um único array e 'Cripto' como
+        # categórica (códigos int8), sem materializar uma string por linha.
+        # As categorias ficam em ordem alfabética, como no groupby por string.
+        categorias = sorted(dados)
+        tamanhos = np.fromiter((len(dados[coin]) for coin in categorias), dtype=np.int64, count=len(categorias))
+        codigos = np.repeat(np.arange(len(categorias), dtype=np.int8), tamanhos)
+        df_all = pd.DataFrame({
+            'close': np.concatenate([dados[coin]['close'].to_numpy() for coin in categorias]),
+            'Cripto': pd.Categorical.from_codes(codigos, categories=categorias),
+        })
 
         analise_estatistica(df_all)
         logger.info("Análise estatística concluída!")
@@ -84,9 +130,23 @@ def run_descriptive_analysis(dpi: int) -> None:
         salvar_boxplot_precos(dados, 'figures', dpi=dpi)
         salvar_histograma_precos(dados, 'figures', dpi=dpi)
 
-        for crypto in dados.keys():
-            logger.info(f"Gerando gráfico para {crypto}...")
-            salvar_linha_media_mediana_moda(dados, crypto, 'figures/cryptos', dpi=dpi)
+        # As estatísticas móveis são calculadas aqui, no processo principal: ficam em cache para
+        # salvar_multiplos_graficos_linha e os processos recebem apenas os arrays prontos para desenhar
+        tarefas = [
+            (crypto, df['close'], *_summary_stats(df), 'figures/cryptos', dpi) for crypto, df in dados.items()
+        ]
+
+        # Os gráficos por cripto são independentes: um processo por núcleo. Com um único núcleo, o custo
+        # de iniciar um processo (que reimporta os módulos) não compensa e os gráficos são gerados aqui.
+        workers = min(len(tarefas), os.cpu_count() or 1)
+        if workers > 1:
+            # 'spawn' em vez de fork: o processo pai já iniciou as threads do Numba (grouped_stats),
+            # e um fork com essas threads ativas pode travar.
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                list(executor.map(_plot_one, tarefas))
+        else:
+            for tarefa in tarefas:
+                _plot_one(tarefa)
 
         salvar_multiplos_graficos_linha(dados, 'figures', dpi=dpi)
         print('Gráficos gerados em figures/')
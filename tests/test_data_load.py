@@ -1,6 +1,25 @@
+import os
 import pytest
 import pandas as pd
-from modules.data_load import load_all_cryptos
+from modules.data_load import load_all_cryptos, _is_cache_fresh, CACHE_DIR, CRYPTOS
+
+
+_HEADER = "Unix,Date,Symbol,Open,High,Low,Close,Volume,tradecount\n"
+
+
+def _write_csv(path, coin, closes):
+    """Grava um CSV no formato do CryptoDataDownload (linha de origem + cabeçalho), em ordem decrescente de data."""
+    dates = pd.date_range('2023-01-01', periods=len(closes), freq='D')
+    rows = [f"0,{d.date()},{coin}USDT,{c},{c},{c},{c},1.0,10\n" for d, c in zip(dates[::-1], closes[::-1])]
+    path.write_text("https://www.CryptoDataDownload.com\n" + _HEADER + "".join(rows))
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    """Pasta temporária com um CSV pequeno para cada criptomoeda."""
+    for coin in CRYPTOS:
+        _write_csv(tmp_path / f"{coin}.csv", coin, [1.0, 2.0, 3.0])
+    return tmp_path
 
 
 class TestDataLoad:
@@ -29,3 +48,68 @@ class TestDataLoad:
 
         assert isinstance(result, dict)
         assert len(result) == 0
+
+
+class TestDataLoadCache:
+    """Casos de teste para a leitura do CSV, o cache em Parquet e o reaproveitamento no processo."""
+
+    def test_reads_csv_skipping_source_line(self, csv_dir):
+        """Testa que a linha de origem é pulada e o cabeçalho é lido corretamente pelo PyArrow."""
+        df = load_all_cryptos(f"{csv_dir}/")['BTC']
+
+        assert list(df.columns) == ['unix', 'symbol', 'open', 'high', 'low', 'close', 'volume', 'tradecount']
+        assert df.index.name == 'date'
+        assert df.index.is_monotonic_increasing
+        assert df['close'].tolist() == [1.0, 2.0, 3.0]
+
+    def test_cache_freshness(self, csv_dir):
+        """Testa que o Parquet só é considerado válido se existir e for mais novo que o CSV."""
+        csv_path = str(csv_dir / "BTC.csv")
+        cache_path = str(csv_dir / CACHE_DIR / "BTC.parquet")
+        assert not _is_cache_fresh(cache_path, csv_path)
+
+        load_all_cryptos(f"{csv_dir}/")
+        assert os.path.exists(cache_path)
+        assert _is_cache_fresh(cache_path, csv_path)
+
+        # CSV alterado depois do cache: o Parquet fica desatualizado
+        mtime = os.path.getmtime(cache_path)
+        os.utime(csv_path, (mtime + 10, mtime + 10))
+        assert not _is_cache_fresh(cache_path, csv_path)
+
+    def test_stale_cache_is_rebuilt_from_csv(self, csv_dir):
+        """Testa que um CSV mais novo que o Parquet é relido e o Parquet é regravado com os novos dados."""
+        load_all_cryptos(f"{csv_dir}/")
+
+        cache_path = csv_dir / CACHE_DIR / "BTC.parquet"
+        _write_csv(csv_dir / "BTC.csv", "BTC", [5.0, 6.0, 7.0])
+        mtime = os.path.getmtime(cache_path)
+        os.utime(csv_dir / "BTC.csv", (mtime + 10, mtime + 10))
+
+        # Mesma pasta por outro caminho equivalente (sem a barra final): não reaproveita o cache em memória
+        assert load_all_cryptos(str(csv_dir))['BTC']['close'].tolist() == [5.0, 6.0, 7.0]
+        assert pd.read_parquet(cache_path)['close'].tolist() == [5.0, 6.0, 7.0]
+
+    def test_memoized_result_is_copied(self, csv_dir):
+        """Testa que os dados ficam em memória e que o chamador recebe cópias que pode alterar."""
+        base_path = f"{csv_dir}/"
+        first = load_all_cryptos(base_path)
+        first['BTC'].loc[:, 'close'] = -1.0
+
+        # Sem os arquivos, os dados só podem vir do cache em memória
+        for coin in CRYPTOS:
+            os.remove(csv_dir / f"{coin}.csv")
+        second = load_all_cryptos(base_path)
+
+        assert set(second) == set(CRYPTOS)
+        assert second['BTC']['close'].tolist() == [1.0, 2.0, 3.0]
+
+    def test_partial_load_is_not_memoized(self, csv_dir):
+        """Testa que uma carga com falha não é reaproveitada: a próxima chamada lê os arquivos de novo."""
+        base_path = f"{csv_dir}/"
+        (csv_dir / "BTC.csv").write_text("arquivo inválido")
+
+        assert 'BTC' not in load_all_cryptos(base_path)
+
+        _write_csv(csv_dir / "BTC.csv", "BTC", [1.0, 2.0, 3.0])
+        assert 'BTC' in load_all_cryptos(base_path)
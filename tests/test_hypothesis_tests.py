@@ -94,3 +94,17 @@ class TestHypothesisTests:
 
         assert isinstance(result, dict)
         assert 'SHORT' in result
+
+    def test_test_mean_return_invalid_coin_is_isolated(self):
+        """Testa que uma moeda com fechamento não numérico é ignorada sem afetar as demais."""
+        bad_df = pd.DataFrame({'close': ['abc'] * 100}, index=self.btc_df.index)
+        data = {'BTC': self.btc_df, 'BAD': bad_df, 'ETH': self.eth_df}
+
+        for test in (perform_mean_return_test, perform_mean_return_monthly_test):
+            result = test(data)
+            expected = test(self.data_dict)
+
+            assert list(result) == ['BTC', 'BAD', 'ETH']
+            assert np.isnan(result['BAD'][0]) and result['BAD'][3] is False
+            np.testing.assert_equal(result['BTC'], expected['BTC'])
+            np.testing.assert_equal(result['ETH'], expected['ETH'])
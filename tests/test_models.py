@@ -2,13 +2,20 @@ import pytest
 import pandas as pd
 import numpy as np
 
+from joblib import Memory
 from sklearn.neural_network import MLPRegressor
 
+from modules import models
 from modules.models import (
     prepare_features,
     train_mlp_model,
+    train_mlp_model_cached,
     evaluate_model,
-    split_data
+    split_data,
+    train_linear_model,
+    train_polynomial_models,
+    MLP_PARAMS,
+    _gather_rows
 )
 
 
@@ -113,6 +120,30 @@ class TestModels:
             model = train_mlp_model(X, y, k=k)
             assert model is not None
 
+    def test_train_mlp_model_cached_does_not_cache_failures(self, monkeypatch, tmp_path):
+        """Testa que uma falha no treino retorna None sem ser gravada no cache em disco."""
+        # Cache em diretório temporário, para não deixar arquivos em cache/models do repositório
+        cached = Memory(tmp_path, verbose=0).cache(models._train_mlp_kfold)
+        monkeypatch.setattr(models, '_train_mlp_kfold_cached', cached)
+
+        X = np.array([[1, 2], [3, 4], [5, 6]])
+        y = np.array([3, 7, 11])
+
+        # k maior que o número de amostras: o KFold falha
+        assert train_mlp_model_cached(X, y, k=5) is None
+        assert not cached.check_call_in_cache(X, y, 5, MLP_PARAMS)
+
+    def test_gather_rows_reuses_buffer(self):
+        """Testa que as linhas de cada fold são copiadas corretamente para o mesmo buffer."""
+        X = np.arange(20, dtype=np.float32).reshape(10, 2)
+
+        first = _gather_rows('teste', X, np.array([0, 2, 4, 6, 8]))
+        np.testing.assert_array_equal(first, X[[0, 2, 4, 6, 8]])
+
+        second = _gather_rows('teste', X, np.array([9, 1, 3]))
+        np.testing.assert_array_equal(second, X[[9, 1, 3]])
+        assert np.shares_memory(first, second)
+
     def test_evaluate_model_basic(self):
         """Testa a avaliação básica do modelo."""
         X = np.array([[1, 2], [3, 4], [5, 6], [7, 8], [9, 10]])
@@ -142,3 +173,16 @@ class TestModels:
 
         assert metrics['r2'] > 0.9
         assert metrics['mse'] < 2.0
+
+    def test_regression_models_predict_float32_features(self):
+        """Testa que os modelos linear e polinomial preveem a partir das features float32 de prepare_features."""
+        # Preços na escala do BTC: em float32, lag ** 10 estoura o limite do tipo
+        prices = 60000 + np.cumsum(np.random.default_rng(42).normal(0, 500, 60))
+        df = pd.DataFrame({'close': prices}, index=pd.date_range('2023-01-01', periods=60, freq='D'))
+        X, y = prepare_features(df, window=3)
+        assert X.dtype == np.float32
+
+        models = {'linear': train_linear_model(X[:-10], y[:-10]), **train_polynomial_models(X[:-10], y[:-10], degrees=[10])}
+
+        for model in models.values():
+            assert np.isfinite(model.predict(X[-10:])).all()
@@ -0,0 +1,32 @@
+import pandas as pd
+import numpy as np
+from modules.numba_grouped import grouped_stats
+
+
+class TestNumbaGrouped:
+    """Testes para o kernel de estatísticas por grupo compilado com Numba."""
+
+    def setup_method(self):
+        """Configura dados de teste para cada método."""
+        np.random.seed(42)
+        self.prices = 100 + np.cumsum(np.random.normal(0, 1, 60))
+
+        # Série com NaN no meio
+        self.prices_nan = self.prices.copy()
+        self.prices_nan[[10, 30]] = np.nan
+
+    def test_grouped_stats_matches_pandas_groupby(self):
+        """Testa as estatísticas por grupo contra o groupby do pandas (NaN ignorados)."""
+        codes = np.repeat([0, 1, 2], [20, 25, 15])
+        order = np.argsort(codes, kind='stable')
+        starts = np.array([0, 20, 45, 60])
+
+        count, mean, median, var, minimum, maximum = grouped_stats(self.prices_nan, order, starts)
+        expected = pd.Series(self.prices_nan).groupby(codes).agg(['count', 'mean', 'median', 'var', 'min', 'max'])
+
+        np.testing.assert_array_equal(count, expected['count'])
+        np.testing.assert_allclose(mean, expected['mean'], rtol=1e-12)
+        np.testing.assert_allclose(median, expected['median'], rtol=1e-12)
+        np.testing.assert_allclose(var, expected['var'], rtol=1e-10)
+        np.testing.assert_array_equal(minimum, expected['min'])
+        np.testing.assert_array_equal(maximum, expected['max'])
@@ -0,0 +1,43 @@
+import numpy as np
+from sklearn.metrics import mean_squared_error, r2_score
+from scipy.stats import pearsonr
+from modules.numba_metrics import regression_metrics
+
+
+class TestNumbaMetrics:
+    """Testes para o kernel de métricas de regressão compilado com Numba."""
+
+    def setup_method(self):
+        """Configura dados de teste para cada método."""
+        np.random.seed(42)
+        self.prices = 100 + np.cumsum(np.random.normal(0, 1, 60))
+
+    def test_regression_metrics_matches_sklearn_scipy(self):
+        """Testa as métricas de regressão contra sklearn/scipy para vários modelos."""
+        y = self.prices[:30]
+        P = np.stack([y + np.random.normal(0, s, 30) for s in (0.5, 1.0, 2.0)])
+
+        mse, r2, corr, std = regression_metrics(y, P)
+
+        for i in range(P.shape[0]):
+            assert np.isclose(mse[i], mean_squared_error(y, P[i]))
+            assert np.isclose(r2[i], r2_score(y, P[i]))
+            assert np.isclose(corr[i], pearsonr(y, P[i])[0])
+            assert np.isclose(std[i], np.std(y - P[i]))
+
+    def test_regression_metrics_constant_series(self):
+        """Testa previsões e valores reais constantes: correlação NaN e R² como no r2_score, sem exceção."""
+        y = self.prices[:30]
+        P = np.stack([y + 1, np.full(30, 5.0)])
+
+        mse, r2, corr, std = regression_metrics(y, P)
+
+        assert np.isclose(r2[1], r2_score(y, P[1]))
+        assert np.isnan(corr[1])
+        assert np.isclose(mse[1], mean_squared_error(y, P[1]))
+
+        y_const = np.full(30, 5.0)
+        _, r2_const, corr_const, _ = regression_metrics(y_const, P)
+
+        np.testing.assert_array_equal(r2_const, [r2_score(y_const, P[0]), r2_score(y_const, P[1])])
+        assert np.isnan(corr_const).all()
@@ -0,0 +1,23 @@
+import pandas as pd
+import numpy as np
+from modules.numba_returns import pct_change_2d
+
+
+class TestNumbaReturns:
+    """Testes para o kernel de variação percentual compilado com Numba."""
+
+    def setup_method(self):
+        """Configura dados de teste para cada método."""
+        np.random.seed(42)
+        self.prices = 100 + np.cumsum(np.random.normal(0, 1, 60))
+
+        # Série com NaN no meio
+        self.prices_nan = self.prices.copy()
+        self.prices_nan[[10, 30]] = np.nan
+
+    def test_pct_change_2d_matches_pandas(self):
+        """Testa a variação percentual por coluna contra DataFrame.pct_change()."""
+        prices = np.column_stack([self.prices, self.prices_nan, self.prices[::-1]])
+
+        expected = pd.DataFrame(prices).pct_change().to_numpy()[1:]
+        np.testing.assert_allclose(pct_change_2d(prices), expected, rtol=1e-12)
@@ -0,0 +1,39 @@
+import pandas as pd
+import numpy as np
+from modules.numba_rolling import rolling_mean_7, rolling_median_7
+
+
+class TestNumbaRolling:
+    """Testes para os kernels de média e mediana móveis compilados com Numba."""
+
+    def setup_method(self):
+        """Configura dados de teste para cada método."""
+        np.random.seed(42)
+        self.prices = 100 + np.cumsum(np.random.normal(0, 1, 60))
+
+        # Série com NaN no meio
+        self.prices_nan = self.prices.copy()
+        self.prices_nan[[10, 30]] = np.nan
+
+    def test_rolling_mean_7_matches_pandas(self):
+        """Testa que a média móvel é igual à do pandas."""
+        expected = pd.Series(self.prices).rolling(7).mean().to_numpy()
+        np.testing.assert_allclose(rolling_mean_7(self.prices), expected, rtol=1e-10)
+
+    def test_rolling_median_7_matches_pandas(self):
+        """Testa que a mediana móvel é igual à do pandas."""
+        expected = pd.Series(self.prices).rolling(7).median().to_numpy()
+        np.testing.assert_array_equal(rolling_median_7(self.prices), expected)
+
+    def test_rolling_windows_with_nan(self):
+        """Testa que janelas contendo NaN resultam em NaN, como no pandas."""
+        series = pd.Series(self.prices_nan)
+        np.testing.assert_allclose(rolling_mean_7(self.prices_nan), series.rolling(7).mean().to_numpy(), rtol=1e-10)
+        np.testing.assert_array_equal(rolling_median_7(self.prices_nan), series.rolling(7).median().to_numpy())
+
+    def test_rolling_short_series(self):
+        """Testa séries menores que a janela (somente NaN)."""
+        short = np.array([1.0, 2.0, 3.0])
+
+        assert np.isnan(rolling_mean_7(short)).all()
+        assert np.isnan(rolling_median_7(short)).all()
@@ -1,54 +1,57 @@
 import numpy as np
-from modules.simulation import simulate_profit
+import pytest
+from modules.simulation import simulate_profit, simulate_profit_batch, simulate_profit_series, _simulate_profit_kernel
 
 
-class TestSimulation:
-    """Testes para as funções de simulação de lucro."""
-
-    def setup_method(self):
-        """Configura dados de teste para cada método."""
-        np.random.seed(42)
-
+@pytest.fixture(scope="module")
+def sim_data():
+    """Séries de preços reais e previstos, criadas uma única vez e compartilhadas (somente leitura) pelos testes."""
+    return {
         # Criar dados simulados de preços reais e previstos
-        self.y_true = np.array([100, 101, 99, 102, 103, 98, 104, 105, 97, 106])
-        self.y_pred = np.array([100.5, 100.8, 99.2, 101.5, 102.8, 98.5, 103.2, 104.5, 97.8, 105.2])
+        'y_true': np.array([100, 101, 99, 102, 103, 98, 104, 105, 97, 106], dtype=np.float32),
+        'y_pred': np.array([100.5, 100.8, 99.2, 101.5, 102.8, 98.5, 103.2, 104.5, 97.8, 105.2], dtype=np.float32),
 
         # Dados com tendência de alta
-        self.y_true_up = np.array([100, 102, 104, 106, 108, 110, 112, 114, 116, 118])
-        self.y_pred_up = np.array([101, 103, 105, 107, 109, 111, 113, 115, 117, 119])
+        'y_true_up': np.array([100, 102, 104, 106, 108, 110, 112, 114, 116, 118], dtype=np.float32),
+        'y_pred_up': np.array([101, 103, 105, 107, 109, 111, 113, 115, 117, 119], dtype=np.float32),
 
         # Dados com tendência de baixa
-        self.y_true_down = np.array([100, 98, 96, 94, 92, 90, 88, 86, 84, 82])
-        self.y_pred_down = np.array([99, 97, 95, 93, 91, 89, 87, 85, 83, 81])
+        'y_true_down': np.array([100, 98, 96, 94, 92, 90, 88, 86, 84, 82], dtype=np.float32),
+        'y_pred_down': np.array([99, 97, 95, 93, 91, 89, 87, 85, 83, 81], dtype=np.float32),
+    }
+
+
+class TestSimulation:
+    """Testes para as funções de simulação de lucro."""
 
-    def test_simulate_profit_basic(self):
+    def test_simulate_profit_basic(self, sim_data):
         """Testa a simulação básica de lucro."""
         initial_balance = 1000.0
-        final_balance = simulate_profit(self.y_true, self.y_pred, initial_balance)
+        final_balance = simulate_profit(sim_data['y_true'], sim_data['y_pred'], initial_balance)
 
         assert isinstance(final_balance, float)
         assert final_balance >= 0  # Saldo final não pode ser negativo
         assert final_balance != initial_balance  # Deve haver alguma mudança
 
-    def test_simulate_profit_different_initial_balances(self):
+    def test_simulate_profit_different_initial_balances(self, sim_data):
         """Testa diferentes saldos iniciais."""
         for initial_balance in [100, 1000, 10000]:
-            final_balance = simulate_profit(self.y_true, self.y_pred, initial_balance)
+            final_balance = simulate_profit(sim_data['y_true'], sim_data['y_pred'], initial_balance)
             assert isinstance(final_balance, float)
             assert final_balance >= 0
 
-    def test_simulate_profit_upward_trend(self):
+    def test_simulate_profit_upward_trend(self, sim_data):
         """Testa simulação com tendência de alta."""
         initial_balance = 1000.0
-        final_balance = simulate_profit(self.y_true_up, self.y_pred_up, initial_balance)
+        final_balance = simulate_profit(sim_data['y_true_up'], sim_data['y_pred_up'], initial_balance)
 
         # Em tendência de alta, deve haver lucro
         assert final_balance > initial_balance
 
-    def test_simulate_profit_downward_trend(self):
+    def test_simulate_profit_downward_trend(self, sim_data):
         """Testa simulação com tendência de baixa."""
         initial_balance = 1000.0
-        final_balance = simulate_profit(self.y_true_down, self.y_pred_down, initial_balance)
+        final_balance = simulate_profit(sim_data['y_true_down'], sim_data['y_pred_down'], initial_balance)
 
         # Em tendência de baixa, pode haver perda
         assert isinstance(final_balance, float)
@@ -123,15 +126,39 @@ class TestSimulation:
         assert isinstance(final_balance, float)
         assert final_balance >= 0
 
-    def test_simulate_profit_consistency(self):
+    def test_simulate_profit_float32_matches_float64(self, sim_data):
+        """Testa que entradas float32 dão o mesmo saldo que as mesmas entradas em float64."""
+        y_true, y_pred = sim_data['y_true'], sim_data['y_pred']
+
+        result_32 = simulate_profit(y_true, y_pred, 1000.0)
+        result_64 = simulate_profit(y_true.astype(np.float64), y_pred.astype(np.float64), 1000.0)
+
+        assert result_32 == result_64
+
+    def test_simulate_profit_length_mismatch(self):
+        """Testa que y_true e y_pred de tamanhos diferentes geram erro em vez de leitura fora do array."""
+        y_true = np.linspace(10, 20, 1000)
+        y_pred = np.linspace(10, 30, 3)
+
+        with pytest.raises(ValueError):
+            simulate_profit(y_true, y_pred, 1000.0)
+        with pytest.raises(ValueError):
+            simulate_profit_series(y_true, y_pred, 1000.0)
+        with pytest.raises(ValueError):
+            simulate_profit_batch(y_true[None, :], y_pred[None, :], 1000.0)
+
+        # O próprio kernel (exportado também na versão AOT) verifica os tamanhos
+        with pytest.raises(ValueError):
+            _simulate_profit_kernel(y_true, y_pred, 1000.0, 1.0)
+
+    def test_simulate_profit_consistency(self, sim_data):
         """Testa consistência da simulação."""
-        # Executar múltiplas vezes com os mesmos dados
+        # Executar múltiplas vezes com os mesmos dados, em uma única chamada em lote
         initial_balance = 1000.0
-        results = []
-
-        for _ in range(5):
-            final_balance = simulate_profit(self.y_true, self.y_pred, initial_balance)
-            results.append(final_balance)
+        results = simulate_profit_batch(
+            np.tile(sim_data['y_true'], (5, 1)), np.tile(sim_data['y_pred'], (5, 1)), initial_balance
+        )
 
-        # Todos os resultados devem ser iguais (determinístico)
-        assert len(set(results)) == 1
+        # Todos os resultados devem ser iguais (determinístico) e iguais aos de simulate_profit
+        assert len(np.unique(results)) == 1
+        assert results[0] == simulate_profit(sim_data['y_true'], sim_data['y_pred'], initial_balance)
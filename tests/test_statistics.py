@@ -1,47 +1,45 @@
 import pandas as pd
 import numpy as np
+import pytest
 from anova import calculate_avg_daily_returns
 
 
+# Índices de datas criados uma única vez (DatetimeIndex é imutável, pode ser compartilhado)
+_DATES_100 = pd.date_range('2023-01-01', periods=100, freq='D')
+_DATES_50 = pd.date_range('2023-01-01', periods=50, freq='D')
+
+
+@pytest.fixture(scope="module")
+def stats_data():
+    """Dados simulados de preços, gerados uma única vez e compartilhados (somente leitura) pelos testes."""
+    # Criar dados simulados para diferentes criptomoedas
+    np.random.seed(42)
+
+    # Simular preços de fechamento com tendência e volatilidade
+    btc_prices = 50000 + np.cumsum(np.random.normal(0, 1000, 100))
+    eth_prices = 3000 + np.cumsum(np.random.normal(0, 100, 100))
+    ada_prices = 1 + np.cumsum(np.random.normal(0, 0.05, 100))
+
+    # Dicionário de dados
+    return {
+        'BTC': pd.DataFrame({'close': btc_prices}, index=_DATES_100),
+        'ETH': pd.DataFrame({'close': eth_prices}, index=_DATES_100),
+        'ADA': pd.DataFrame({'close': ada_prices}, index=_DATES_100)
+    }
+
+
+@pytest.fixture(scope="module")
+def avg_returns(stats_data):
+    """Retornos diários de stats_data, calculados uma única vez para os testes que apenas os leem."""
+    return calculate_avg_daily_returns(stats_data)
+
+
 class TestStatistics:
     """Testes para as funções estatísticas."""
 
-    def setup_method(self):
-        """Configura dados de teste para cada método."""
-        # Criar dados simulados para diferentes criptomoedas
-        np.random.seed(42)
-
-        # Datas comuns
-        dates = pd.date_range('2023-01-01', periods=100, freq='D')
-
-        # Simular preços de fechamento com tendência e volatilidade
-        btc_prices = 50000 + np.cumsum(np.random.normal(0, 1000, 100))
-        eth_prices = 3000 + np.cumsum(np.random.normal(0, 100, 100))
-        ada_prices = 1 + np.cumsum(np.random.normal(0, 0.05, 100))
-
-        # Criar DataFrames
-        self.btc_df = pd.DataFrame({
-            'close': btc_prices
-        }, index=dates)
-
-        self.eth_df = pd.DataFrame({
-            'close': eth_prices
-        }, index=dates)
-
-        self.ada_df = pd.DataFrame({
-            'close': ada_prices
-        }, index=dates)
-
-        # Dicionário de dados
-        self.data_dict = {
-            'BTC': self.btc_df,
-            'ETH': self.eth_df,
-            'ADA': self.ada_df
-        }
-
-    def test_calculate_avg_daily_returns_basic(self):
+    def test_calculate_avg_daily_returns_basic(self, avg_returns):
         """Testa o cálculo básico de retornos diários."""
-        result = calculate_avg_daily_returns(self.data_dict)
+        result = avg_returns
 
         assert isinstance(result, pd.DataFrame)
         assert len(result.columns) == 3  # BTC, ETH, ADA
@@ -53,9 +51,9 @@ class TestStatistics:
             assert result[col].min() >= -1
             assert result[col].max() <= 1
 
-    def test_calculate_avg_daily_returns_structure(self):
+    def test_calculate_avg_daily_returns_structure(self, avg_returns):
         """Testa a estrutura do DataFrame de retornos."""
-        result = calculate_avg_daily_returns(self.data_dict)
+        result = avg_returns
 
         # Verificar se não há valores NaN no início (após dropna)
         assert not result.iloc[0].isna().any()
@@ -63,9 +61,9 @@ class TestStatistics:
         # Verificar se o índice é datetime
         assert isinstance(result.index, pd.DatetimeIndex)
 
-    def test_calculate_avg_daily_returns_alignment(self):
+    def test_calculate_avg_daily_returns_alignment(self, avg_returns):
         """Testa se os dados são alinhados corretamente."""
-        result = calculate_avg_daily_returns(self.data_dict)
+        result = avg_returns
 
         # Verificar se todas as colunas têm o mesmo número de linhas
         lengths = [len(result[col].dropna()) for col in result.columns]
@@ -80,9 +78,9 @@ class TestStatistics:
         assert len(result.columns) == 0
         assert len(result) == 0
 
-    def test_calculate_avg_daily_returns_single_crypto(self):
+    def test_calculate_avg_daily_returns_single_crypto(self, stats_data):
         """Testa com apenas uma criptomoeda."""
-        single_dict = {'BTC': self.btc_df}
+        single_dict = {'BTC': stats_data['BTC']}
         result = calculate_avg_daily_returns(single_dict)
 
         assert isinstance(result, pd.DataFrame)
@@ -93,14 +91,11 @@ class TestStatistics:
     def test_calculate_avg_daily_returns_different_lengths(self):
         """Testa com criptomoedas de diferentes tamanhos."""
         # Criar dados com tamanhos diferentes
-        short_dates = pd.date_range('2023-01-01', periods=50, freq='D')
-        long_dates = pd.date_range('2023-01-01', periods=100, freq='D')
-
         short_prices = 1000 + np.cumsum(np.random.normal(0, 10, 50))
         long_prices = 2000 + np.cumsum(np.random.normal(0, 20, 100))
 
-        short_df = pd.DataFrame({'close': short_prices}, index=short_dates)
-        long_df = pd.DataFrame({'close': long_prices}, index=long_dates)
+        short_df = pd.DataFrame({'close': short_prices}, index=_DATES_50)
+        long_df = pd.DataFrame({'close': long_prices}, index=_DATES_100)
 
         mixed_dict = {
             'SHORT': short_df,
@@ -117,10 +112,30 @@ class TestStatistics:
         constant_prices = np.full(100, 1000)
         constant_df = pd.DataFrame({
             'close': constant_prices
-        }, index=pd.date_range('2023-01-01', periods=100, freq='D'))
+        }, index=_DATES_100)
 
         constant_dict = {'CONST': constant_df}
         result = calculate_avg_daily_returns(constant_dict)
 
         # Retornos devem ser 0 (exceto o primeiro que será NaN)
         assert result['CONST'].iloc[1:].abs().max() < 1e-10
+
+    def test_calculate_avg_daily_returns_unsorted_index(self, stats_data):
+        """Testa índices fora de ordem (caminho genérico do pandas): retorno em relação à linha anterior, como no pct_change."""
+        shuffled = {crypto: df.iloc[::-1] for crypto, df in stats_data.items()}
+        result = calculate_avg_daily_returns(shuffled)
+
+        expected = pd.concat({crypto: df['close'].pct_change() for crypto, df in shuffled.items()}, axis=1)
+        pd.testing.assert_frame_equal(result, expected.dropna().sort_index(), check_freq=False)
+
+    def test_calculate_avg_daily_returns_missing_date(self):
+        """Testa que um dia ausente em uma moeda não vira retorno de vários dias nas outras."""
+        dates = pd.date_range('2023-01-01', periods=5, freq='D')
+        full_df = pd.DataFrame({'close': [100.0, 110.0, 120.0, 130.0, 140.0]}, index=dates)
+        gap_df = pd.DataFrame({'close': [10.0, 11.0, 13.0, 14.0]}, index=dates.delete(2))
+
+        result = calculate_avg_daily_returns({'GAP': gap_df, 'FULL': full_df})
+
+        assert list(result.index) == list(dates[[1, 3, 4]])
+        np.testing.assert_allclose(result['FULL'], [0.1, 130 / 120 - 1, 140 / 130 - 1])
+        np.testing.assert_allclose(result['GAP'], [0.1, 13 / 11 - 1, 14 / 13 - 1])
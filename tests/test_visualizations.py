@@ -1,5 +1,7 @@
 import pandas as pd
+import numpy as np
 import os
+import pytest
 
 from modules.visualizations import (
     salvar_boxplot_precos,
@@ -8,31 +10,90 @@ from modules.visualizations import (
 )
 
 
-def test_boxplot_creation(tmp_path):
+# Índice de datas criado uma única vez (DatetimeIndex é imutável, pode ser compartilhado)
+_DATES_30 = pd.date_range("2023-01-01", periods=30)
+
+
+@pytest.fixture(scope="module")
+def viz_dir(tmp_path_factory):
+    """Diretório temporário único para o módulo; cada teste grava um arquivo com nome próprio."""
+    return tmp_path_factory.mktemp('viz')
+
+
+def test_boxplot_creation(viz_dir):
     data_dict = {
         'BTC': pd.DataFrame({'close': list(range(10))}),
         'ETH': pd.DataFrame({'close': list(range(10, 20))})
     }
-    out = str(tmp_path)
-    salvar_boxplot_precos(data_dict, out, dpi=250)
+    out = str(viz_dir)
+    salvar_boxplot_precos(data_dict, out, dpi=100)
+    assert os.path.exists(os.path.join(out, "boxplot_fechamento.png"))
+
+
+def test_boxplot_skips_series_without_prices(viz_dir):
+    """Moedas vazias ou só com NaN ficam fora do boxplot; sem nenhuma válida o gráfico não é gerado."""
+    data_dict = {
+        'BTC': pd.DataFrame({'close': list(range(10))}),
+        'VAZIA': pd.DataFrame({'close': np.array([], dtype=float)}),
+        'NAN': pd.DataFrame({'close': [np.nan] * 5})
+    }
+    out = str(viz_dir / 'boxplot_parcial')
+    salvar_boxplot_precos(data_dict, out, dpi=100)
     assert os.path.exists(os.path.join(out, "boxplot_fechamento.png"))
 
+    out = str(viz_dir / 'boxplot_vazio')
+    salvar_boxplot_precos({'NAN': data_dict['NAN']}, out, dpi=100)
+    assert not os.path.exists(os.path.join(out, "boxplot_fechamento.png"))
+
 
-def test_histogram_creation(tmp_path):
+def test_histogram_creation(viz_dir):
     data_dict = {
         'TEST': pd.DataFrame({'close': list(range(100))})
     }
-    out = str(tmp_path)
-    salvar_histograma_precos(data_dict, out, dpi=250)
+    out = str(viz_dir)
+    salvar_histograma_precos(data_dict, out, dpi=100)
+    assert os.path.exists(os.path.join(out, "histograma_fechamento.png"))
+
+
+def test_histogram_constant_prices(viz_dir):
+    data_dict = {
+        'TEST': pd.DataFrame({'close': [5.0] * 20})
+    }
+    # Mesmo nome de arquivo do teste anterior: subdiretório próprio para não reaproveitar o PNG dele
+    out = str(viz_dir / 'constante')
+    salvar_histograma_precos(data_dict, out, dpi=100)
     assert os.path.exists(os.path.join(out, "histograma_fechamento.png"))
 
 
-def test_line_graph_creation(tmp_path):
+def test_histogram_without_valid_prices(viz_dir):
+    """Sem moedas ou só com preços NaN/inf o histograma não é gerado, sem erro."""
+    out = str(viz_dir / 'sem_precos')
+    salvar_histograma_precos({}, out, dpi=100)
+    salvar_histograma_precos({'NAN': pd.DataFrame({'close': [np.nan, np.inf, np.nan]})}, out, dpi=100)
+    assert not os.path.exists(os.path.join(out, "histograma_fechamento.png"))
+
+
+def test_line_graph_creation(viz_dir):
     data_dict = {
         'TEST': pd.DataFrame({
             'close': list(range(30))
-        }, index=pd.date_range("2023-01-01", periods=30))
+        }, index=_DATES_30)
     }
-    out = str(tmp_path)
-    salvar_linha_media_mediana_moda(data_dict, "TEST", out, dpi=250)
+    out = str(viz_dir)
+    salvar_linha_media_mediana_moda(data_dict, "TEST", out, dpi=100)
     assert os.path.exists(os.path.join(out, "TEST_linha_resumo.png"))
+
+
+@pytest.mark.parametrize("valor, vazio", [("1", True), ("true", True), ("0", False), ("false", False)])
+def test_skip_render(viz_dir, monkeypatch, valor, vazio):
+    """Com SKIP_RENDER ativado o PNG é gravado vazio; com 0/false a imagem é renderizada."""
+    monkeypatch.setenv("SKIP_RENDER", valor)
+    data_dict = {
+        'TEST': pd.DataFrame({'close': list(range(100))})
+    }
+    out = str(viz_dir / f'skip_render_{valor}')
+    salvar_histograma_precos(data_dict, out, dpi=100)
+
+    caminho = os.path.join(out, "histograma_fechamento.png")
+    assert os.path.exists(caminho)
+    assert (os.path.getsize(caminho) == 0) == vazio